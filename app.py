@@ -2,15 +2,20 @@ import streamlit as st
 import os
 import pandas as pd
 import time
-import tempfile
 import plotly.express as px
 from datetime import datetime
+from collections import OrderedDict
 
-from src.parser import ResumeParser
+from src.config import load_config
+from src.parser import EXTRACTOR_VERSION
+from src.pipeline import BackgroundJob, ParsePool, apply_score
 from src.scorer import ResumeScorer
 from src.email_gen import EmailGenerator
-from src.config import load_config
-from src.utils import clean_dataframe_for_excel, detect_duplicates, generate_summary_stats
+from src.store import CandidateStore
+from src.cache import hash_buffer
+from src.dedup import NEAR_DUPLICATE_THRESHOLD
+from src.utils import clean_dataframe_for_excel, RunningSummary
+from src.tracing import Tracer
 
 # Page Config
 st.set_page_config(page_title="Resume Parser & Scorer", page_icon="📄", layout="wide")
@@ -18,9 +23,43 @@ st.set_page_config(page_title="Resume Parser & Scorer", page_icon="📄", layout
 st.title("📄 AI-Powered Resume Parser & Scorer")
 st.markdown("Upload resumes, score them against your JD, and get automated email drafts.")
 
+# Streamlit reruns this script on every interaction; these objects are built once per server
+@st.cache_resource
+def get_config():
+    return load_config()
+
+@st.cache_resource
+def get_scorer(api_key):
+    return ResumeScorer(get_config(), api_key=api_key)
+
+@st.cache_resource
+def get_email_generator():
+    return EmailGenerator(get_config())
+
+# Parsing runs in worker processes that outlive the run, so a click does not pay
+# for starting a pool
+@st.cache_resource
+def get_parse_pool():
+    config = get_config()
+    return ParsePool(config, workers=config.get("app", {}).get("workers") or None)
+
+# Parsed uploads by content hash and name, so editing the JD only re-runs
+# scoring; only uploads not found here are sent to the parse pool
+PARSED_UPLOADS_MAX = 2000
+
+@st.cache_resource
+def get_parsed_uploads():
+    return OrderedDict()
+
+def remember_upload(key, data):
+    parsed = get_parsed_uploads()
+    parsed[key] = data
+    while len(parsed) > PARSED_UPLOADS_MAX:
+        parsed.popitem(last=False)
+
 # Sidebar Config
 st.sidebar.header("Configuration")
-config = load_config()
+config = get_config()
 
 # API Key Input
 api_key = st.sidebar.text_input("OpenAI/Gemini API Key (Optional)", type="password", help="Leave empty to use Basic Keyword Matching")
@@ -34,11 +73,6 @@ smtp_port = st.sidebar.number_input("SMTP Port", value=587, disabled=not send_em
 sender_email = st.sidebar.text_input("Sender Email", disabled=not send_emails)
 sender_password = st.sidebar.text_input("App Password", type="password", disabled=not send_emails)
 
-# Load modules
-parser_module = ResumeParser()
-scorer_module = ResumeScorer(config, api_key=api_key if api_key else None)
-email_module = EmailGenerator(config)
-
 # Input: Job Description
 st.subheader("1. Job Description")
 default_jd = "Python, Django, React, REST API, SQL, 5+ years experience"
@@ -48,71 +82,205 @@ job_description = st.text_area("Paste the Job Description or Keywords here:", va
 st.subheader("2. Upload Resumes")
 uploaded_files = st.file_uploader("Upload PDF or DOCX files", type=["pdf", "docx"], accept_multiple_files=True)
 
+# Candidates parsed by earlier runs (store.path in config.yaml)
+store_config = config.get("store", {})
+search_pool = False
+if store_config.get("path"):
+    search_pool = st.button("Search Candidate Pool", help="Run the JD against every resume in the candidate store instead of uploads")
+
+def highlight_status(val):
+    color = 'white'
+    if val == 'Green': color = '#ccffcc'
+    elif val == 'Yellow': color = '#ffffcc'
+    elif val == 'Red': color = '#ffcccc'
+    elif val == 'Duplicate': color = '#e0e0e0'
+    elif val == 'Error': color = '#ff9999'
+    return f'background-color: {color}'
+
+def show_metrics(stats):
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Candidates", stats.get("Total processed", 0))
+    col2.metric("Interview (Green)", stats.get("Green", 0))
+    col3.metric("Review (Yellow)", stats.get("Yellow", 0))
+    col4.metric("Avg Score", f"{stats.get('Avg Score', 0):.1f}")
+
+def show_table(df):
+    display_cols = ["candidate_name", "email", "score", "status", "duplicate_cluster", "reasoning", "matched_keywords"]
+    # Ensure cols exist
+    final_cols = [c for c in display_cols if c in df.columns]
+    df = df[final_cols]
+    if "duplicate_cluster" in df.columns:
+        # Cluster ids mixed with "" for unique rows; Arrow needs one type per column
+        df = df.astype({"duplicate_cluster": str})
+    styler = df.style
+    # Styler.applymap was renamed to map in pandas 2.1 and removed in 3.0
+    style_cells = styler.map if hasattr(styler, "map") else styler.applymap
+    st.dataframe(style_cells(highlight_status, subset=['status']))
+
+def add_scored(rows):
+    """
+    Score parsed uploads against the run's JD, draft their emails and add
+    them to the run summary.
+    """
+    scorer = st.session_state["scorer"]
+    tracer = st.session_state["tracer"]
+    valid = [data for data in rows if not data.get("error")]
+    with tracer.span("score"):
+        scored = scorer.score_batch([data["raw_text"] for data in valid], st.session_state["jd"],
+                                    sections=[data.get("sections") for data in valid]) if valid else []
+    scored = iter(scored)
+    for data in rows:
+        apply_score(data, None if data.get("error") else next(scored))
+        with tracer.span("email"):
+            data["email_draft"] = get_email_generator().generate(data)
+        # Duplicate detection and summary stats, updated per result
+        with tracer.span("dedup"):
+            st.session_state["summary"].add(data)
+
 if st.button("Process Resumes"):
     if not uploaded_files:
         st.error("Please upload at least one resume.")
     elif not job_description:
         st.error("Please provide a Job Description.")
     else:
-        results = []
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # Create a temp dir to save uploaded files for processing (parser expects paths)
-        with tempfile.TemporaryDirectory() as temp_dir:
-            total_files = len(uploaded_files)
-            
-            for idx, uploaded_file in enumerate(uploaded_files):
-                status_text.text(f"Processing {uploaded_file.name} ({idx+1}/{total_files})...")
-                
-                # Save file
-                file_path = os.path.join(temp_dir, uploaded_file.name)
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                
-                # Parse
-                parsed_data = parser_module.parse_file(file_path)
-                
-                # Score (only if valid)
-                if not parsed_data.get("error"):
-                    score, notes, status, matches = scorer_module.score(parsed_data["raw_text"], job_description)
-                    parsed_data["score"] = score
-                    parsed_data["reasoning"] = notes
-                    parsed_data["status"] = status
-                    parsed_data["matched_keywords"] = matches
-                else:
-                    parsed_data["score"] = 0
-                    parsed_data["reasoning"] = parsed_data.get("notes", "Error")
-                    parsed_data["status"] = "Error"
-                    parsed_data["matched_keywords"] = ""
-                
-                # Email
-                email_body = email_module.generate(parsed_data)
-                parsed_data["email_draft"] = email_body
-                
-                results.append(parsed_data)
-                progress_bar.progress((idx + 1) / total_files)
-        
-        status_text.text("Processing Complete!")
-        
-        # DataFrame Logic
-        df = pd.DataFrame(results)
-        
-        # 1. Duplicate Detection
-        df = detect_duplicates(df)
-        
-        # 2. Summary Stats
-        stats = generate_summary_stats(df)
-        
+        # A new run replaces the previous one
+        if st.session_state.get("job") is not None:
+            st.session_state["job"].cancel()
+        # Uploads parsed by an earlier run are only rescored; new ones are parsed
+        # in the background pool and their results stream in below
+        parsed_uploads = get_parsed_uploads()
+        reused = []
+        documents = []
+        keys = []
+        for f in uploaded_files:
+            key = (hash_buffer(f), f.name)
+            if key in parsed_uploads:
+                reused.append(dict(parsed_uploads[key]))
+            else:
+                documents.append((f.name, f.getvalue()))
+                keys.append(key)
+        st.session_state.pop("pool_size", None)
+        st.session_state.pop("cascade", None)
+        st.session_state["job"] = BackgroundJob(documents, get_parse_pool(), get_email_generator())
+        st.session_state["keys"] = keys
+        st.session_state["reused"] = len(reused)
+        st.session_state["jd"] = job_description
+        st.session_state["scorer"] = get_scorer(api_key or None)
+        st.session_state["summary"] = RunningSummary(config.get("dedup", {}).get("near_duplicate_threshold", NEAR_DUPLICATE_THRESHOLD))
+        st.session_state["tracer"] = Tracer()
+        st.session_state.pop("report", None)
+        # LLM scoring waits for the whole upload set and runs as one concurrent batch,
+        # so a cascade shortlists across all of it; keyword scores take milliseconds
+        # and are added as results arrive
+        st.session_state["unscored"] = []
+        if st.session_state["scorer"].uses_llm:
+            st.session_state["unscored"] = reused
+            st.session_state["cascade_since"] = dict(st.session_state["scorer"].cascade_stats)
+        else:
+            add_scored(reused)
+
+if search_pool:
+    if not job_description:
+        st.error("Please provide a Job Description.")
+    else:
+        if st.session_state.get("job") is not None:
+            st.session_state["job"].cancel()
+        summary = RunningSummary(config.get("dedup", {}).get("near_duplicate_threshold", NEAR_DUPLICATE_THRESHOLD))
+        tracer = Tracer()
+        with st.spinner("Searching the candidate pool..."):
+            # One indexed query, then only the best matches are scored; no file is opened
+            store = CandidateStore.from_config(config, EXTRACTOR_VERSION)
+            with tracer.span("store_search"):
+                candidates = store.search(job_description, store_config.get("search_limit", 100))
+            pool_size = len(store)
+            store.close()
+            email_module = get_email_generator()
+            scorer = get_scorer(api_key or None)
+            # The scorer is shared; report the cascade for this search only
+            before = dict(scorer.cascade_stats)
+            with tracer.span("score"):
+                scored = scorer.score_batch([c["raw_text"] for c in candidates], job_description, sections=[c["sections"] for c in candidates])
+            for data, result in zip(candidates, scored):
+                apply_score(data, result)
+                with tracer.span("email"):
+                    data["email_draft"] = email_module.generate(data)
+                with tracer.span("dedup"):
+                    summary.add(data)
+        st.session_state["job"] = None
+        st.session_state["summary"] = summary
+        st.session_state["tracer"] = tracer
+        st.session_state["pool_size"] = pool_size
+        st.session_state["cascade"] = scorer.cascade_savings(before) if scorer.cascades else None
+        st.session_state["unscored"] = []
+        st.session_state.pop("report", None)
+
+# Re-runs every second while a job is in flight, without redrawing the rest of the page
+@st.fragment(run_every=1)
+def live_results():
+    job = st.session_state["job"]
+    summary = st.session_state["summary"]
+    tracer = st.session_state["tracer"]
+
+    if st.button("Cancel"):
+        job.cancel()
+    for i, data in job.poll(timeout=0.2):
+        tracer.merge(data.pop("_spans", None))
+        data.pop("_cost", None)
+        if not data.get("error"):
+            remember_upload(st.session_state["keys"][i], dict(data))
+        if st.session_state["scorer"].uses_llm:
+            st.session_state["unscored"].append(data)
+        else:
+            add_scored([data])
+    if job.done:
+        # Redraw the whole page with the final report
+        st.rerun()
+
+    reused = st.session_state["reused"]
+    done = reused + job.completed
+    total = reused + job.total
+    st.progress(done / total, text=f"Parsed {done}/{total} resumes...")
+    show_metrics(summary.stats())
+    if summary.rows:
+        show_table(summary.dataframe())
+
+job = st.session_state.get("job")
+if job is not None and not job.done:
+    live_results()
+elif "summary" in st.session_state:
+    if st.session_state.get("unscored"):
+        scorer = st.session_state["scorer"]
+        with st.spinner("Scoring resumes..."):
+            add_scored(st.session_state["unscored"])
+        st.session_state["unscored"] = []
+        st.session_state["cascade"] = scorer.cascade_savings(st.session_state["cascade_since"]) if scorer.cascades else None
+    summary = st.session_state["summary"]
+    tracer = st.session_state["tracer"]
+    if job is not None and job.cancelled:
+        reused = st.session_state["reused"]
+        st.warning(f"Cancelled after {reused + job.completed} of {reused + job.total} resumes.")
+    elif "pool_size" in st.session_state:
+        st.success(f"Best {len(summary.rows)} of {st.session_state['pool_size']} stored candidates.")
+    else:
+        st.success("Processing Complete!")
+    cascade = st.session_state.get("cascade")
+    if cascade:
+        st.info(f"Keyword prefilter: {cascade['LLM calls']} resumes sent to the LLM, "
+                f"{cascade['LLM calls saved']} calls (~{cascade['LLM time saved (s)']}s) saved.")
+
+    # DataFrame Logic
+    df = summary.dataframe()
+
+    # 2. Summary Stats
+    with tracer.span("stats"):
+        stats = summary.stats()
+
+    if not df.empty:
         # Display Metrics
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Total Candidates", stats.get("Total processed", 0))
-        col2.metric("Interview (Green)", stats.get("Green", 0))
-        col3.metric("Review (Yellow)", stats.get("Yellow", 0))
-        col4.metric("Avg Score", f"{stats.get('Avg Score', 0):.1f}")
+        show_metrics(stats)
         
         # Charts
-        if not df.empty and "status" in df.columns:
+        if "status" in df.columns:
             st.subheader("Status Distribution")
             fig = px.pie(df, names='status', title='Candidate Status', 
                          color='status',
@@ -121,21 +289,7 @@ if st.button("Process Resumes"):
 
         # Display Data Table with Colors
         st.subheader("Detailed Results")
-        
-        def highlight_status(val):
-            color = 'white'
-            if val == 'Green': color = '#ccffcc'
-            elif val == 'Yellow': color = '#ffffcc'
-            elif val == 'Red': color = '#ffcccc'
-            elif val == 'Duplicate': color = '#e0e0e0'
-            elif val == 'Error': color = '#ff9999'
-            return f'background-color: {color}'
-
-        display_cols = ["candidate_name", "email", "score", "status", "reasoning", "matched_keywords"]
-        # Ensure cols exist
-        final_cols = [c for c in display_cols if c in df.columns]
-        
-        st.dataframe(df[final_cols].style.applymap(highlight_status, subset=['status']))
+        show_table(df)
         
         # store df in session state for email sending (optional but good practice)
         st.session_state['processed_df'] = df
@@ -143,28 +297,41 @@ if st.button("Process Resumes"):
         # Export
         st.subheader("3. Export Results")
         
-        # Clean data for Excel
-        df_clean = clean_dataframe_for_excel(df.copy())
-        
-        from io import BytesIO
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df_clean.to_excel(writer, index=False, sheet_name='All Candidates')
-            
-            # Summary Sheet
-            pd.DataFrame([stats]).to_excel(writer, index=False, sheet_name='Summary')
+        # Built once per run; the page is redrawn on every interaction
+        if "report" not in st.session_state:
+            # Clean data for Excel
+            df_clean = clean_dataframe_for_excel(df.drop(columns=["text_signature", "sections"], errors="ignore"))
             
-            # Separate sheets
-            if 'Green' in df_clean['status'].values:
-                df_clean[df_clean['status'] == 'Green'].to_excel(writer, index=False, sheet_name='Shortlisted')
+            from io import BytesIO
+            output = BytesIO()
+            with tracer.span("excel_write"), pd.ExcelWriter(output, engine='openpyxl') as writer:
+                df_clean.to_excel(writer, index=False, sheet_name='All Candidates')
+                
+                # Summary Sheet
+                pd.DataFrame([stats]).to_excel(writer, index=False, sheet_name='Summary')
+                
+                # Separate sheets
+                if 'Green' in df_clean['status'].values:
+                    df_clean[df_clean['status'] == 'Green'].to_excel(writer, index=False, sheet_name='Shortlisted')
+            st.session_state["report"] = output.getvalue()
         
         st.download_button(
             label="Download Excel Report",
-            data=output.getvalue(),
+            data=st.session_state["report"],
             file_name=f"resume_report_{datetime.now().strftime('%Y%m%d')}.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
         
+        # Where the time went
+        with st.expander("⏱️ Stage timings"):
+            st.dataframe(pd.DataFrame(tracer.rows()))
+            st.download_button(
+                label="Download Prometheus metrics",
+                data=tracer.prometheus_text(),
+                file_name="resume_analyser_metrics.prom",
+                mime="text/plain"
+            )
+        
         # Email Sending Feature
         if send_emails and not df.empty:
             st.subheader("4. Automated Emailing")
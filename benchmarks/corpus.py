@@ -0,0 +1,162 @@
+"""
+Reproducible synthetic resume corpus.
+
+    python -m benchmarks.corpus ./corpus --size 1000 --formats pdf docx txt
+
+The same size, formats and seed always produce the same files. PDFs are
+written by hand (one Helvetica text object per page), so generating 100k of
+them needs nothing beyond the standard library.
+"""
+import os
+import json
+import random
+import argparse
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Priya", "Wei",
+               "Carlos", "Fatima", "Ahmed", "Yuki", "Olga", "Kwame", "Aisha", "Mateo", "Ananya", "Lars"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Patel", "Chen",
+              "Kumar", "Nakamura", "Ivanova", "Mensah", "Okafor", "Silva", "Reddy", "Larsen", "Kowalski", "Haddad"]
+SKILLS = ["python", "java", "javascript", "typescript", "golang", "rust", "scala", "kotlin", "sql", "postgresql",
+          "mysql", "mongodb", "redis", "kafka", "spark", "hadoop", "airflow", "docker", "kubernetes", "terraform",
+          "aws", "azure", "gcp", "linux", "react", "angular", "django", "flask", "fastapi", "spring",
+          "pandas", "numpy", "pytorch", "tensorflow", "scikit-learn", "tableau", "excel", "git", "jenkins", "graphql",
+          "machine learning", "data engineering", "microservices", "rest apis", "ci/cd", "agile", "scrum", "etl"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises",
+             "Wonka Industries", "Cyberdyne", "Soylent", "Tyrell", "Vandelay Industries"]
+TITLES = ["Software Engineer", "Senior Developer", "Data Engineer", "Backend Engineer", "Data Scientist",
+          "Platform Engineer", "Full Stack Developer", "DevOps Engineer"]
+FILLER = ["Designed and shipped", "Led the migration of", "Improved the reliability of", "Built and maintained",
+          "Reduced the latency of", "Automated the deployment of", "Mentored engineers working on", "Owned"]
+OBJECTS = ["the billing platform", "an internal data lake", "customer-facing APIs", "the search service",
+           "real-time dashboards", "the recommendation pipeline", "batch ETL jobs", "the mobile backend"]
+
+JOB_DESCRIPTION = """Senior Python Data Engineer
+We are looking for an engineer with strong Python and SQL skills and experience building
+data pipelines with Spark, Kafka and Airflow on AWS. Familiarity with Docker, Kubernetes and
+"machine learning" workflows is a plus. You will design ETL jobs, REST APIs and own
+PostgreSQL schemas, working in an agile team with CI/CD.
+"""
+
+LINES_PER_PAGE = 48
+
+
+def make_resume(rng, index, emails):
+    """
+    One synthetic resume as a list of lines. A few percent reuse an earlier
+    candidate's email, so duplicate detection has work to do.
+    """
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    if emails and rng.random() < 0.05:
+        email = rng.choice(emails)
+    else:
+        email = f"{first.lower()}.{last.lower()}{index}@example.com"
+        emails.append(email)
+    phone = f"({rng.randint(200, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+
+    lines = [f"{first} {last}", f"Email: {email}", f"Phone: {phone}", "", "SUMMARY",
+             f"{rng.choice(TITLES)} with {rng.randint(1, 20)} years of experience.", "", "SKILLS"]
+    skills = rng.sample(SKILLS, rng.randint(5, 18))
+    for i in range(0, len(skills), 6):
+        lines.append(", ".join(skills[i:i + 6]))
+    lines += ["", "EXPERIENCE"]
+    for _ in range(rng.randint(2, 8)):
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({rng.randint(2005, 2024)})")
+        for _ in range(rng.randint(2, 6)):
+            lines.append(f"- {rng.choice(FILLER)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}.")
+    lines += ["", "EDUCATION", f"B.Sc. Computer Science, State University ({rng.randint(1995, 2020)})"]
+    return lines
+
+
+def make_pdf(pages):
+    """
+    Minimal PDF with one page per list of lines.
+    """
+    out = [b"%PDF-1.4\n"]
+    offsets = []
+
+    def add(body):
+        offsets.append(sum(len(x) for x in out))
+        out.append(f"{len(offsets)} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    # 1 catalog, 2 pages, 3 font, then a page/content pair per page
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    add(b"<< /Type /Catalog /Pages 2 0 R >>")
+    add(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, lines in enumerate(pages):
+        add(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        ops = ["BT", "/F1 11 Tf", "14 TL", "72 740 Td"]
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({escaped}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        add(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    xref = sum(len(x) for x in out)
+    out.append(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.append(f"{offset:010d} 00000 n \n".encode())
+    out.append(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return b"".join(out)
+
+
+def write_resume(path, lines):
+    ext = os.path.splitext(path)[1]
+    if ext == ".pdf":
+        pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+        with open(path, "wb") as f:
+            f.write(make_pdf(pages))
+    elif ext == ".docx":
+        import docx
+        doc = docx.Document()
+        for line in lines:
+            doc.add_paragraph(line)
+        doc.save(path)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+
+def generate_corpus(out_dir, size, formats=("pdf", "docx", "txt"), seed=0):
+    """
+    Write `size` resumes to out_dir, cycling through formats. Reuses the
+    directory as-is if it already holds a corpus with the same parameters.
+    Returns the list of file paths.
+    """
+    params = {"size": size, "formats": list(formats), "seed": seed}
+    marker = os.path.join(out_dir, "corpus.json")
+    names = [f"resume_{i:06d}.{formats[i % len(formats)]}" for i in range(size)]
+    files = [os.path.join(out_dir, name) for name in names]
+
+    if os.path.exists(marker):
+        with open(marker) as f:
+            if json.load(f) == params:
+                return files
+
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    emails = []
+    for i, path in enumerate(files):
+        write_resume(path, make_resume(rng, i, emails))
+    with open(marker, "w") as f:
+        json.dump(params, f)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume corpus")
+    parser.add_argument("output", help="Directory to write the corpus to")
+    parser.add_argument("--size", type=int, default=1000, help="Number of resumes (default: 1000)")
+    parser.add_argument("--formats", nargs="+", default=["pdf", "docx", "txt"], choices=["pdf", "docx", "txt"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    files = generate_corpus(args.output, args.size, args.formats, args.seed)
+    print(f"{len(files)} resumes in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Stage-by-stage throughput benchmark.
+
+    python -m benchmarks.run --size 1000 --output results.json
+    python -m benchmarks.run --size 1000 --baseline results.json
+
+Times extract_text, extract_candidate_name, BasicScorer.score and the
+near-duplicate text signature per document, and detect_duplicates, clean_dataframe_for_excel and the Excel write
+over the whole batch. Reports docs/sec, p50/p99 latency (per-document stages)
+and peak RSS after each stage. With --baseline, stages more than --threshold
+slower than the baseline are reported and the exit code is 1.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.parser import extract_text, extract_candidate_name
+from src.scorer import BasicScorer
+from src.sink import ExcelSink
+from src.utils import detect_duplicates, clean_dataframe_for_excel
+from src.dedup import text_signature
+from src.config import load_config
+
+from benchmarks.corpus import generate_corpus, JOB_DESCRIPTION
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(docs, seconds, latencies=None):
+    result = {
+        "docs": docs,
+        "seconds": round(seconds, 4),
+        "docs_per_sec": round(docs / seconds, 1) if seconds else None,
+        "p50_ms": None,
+        "p99_ms": None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if latencies:
+        result["p50_ms"] = round(percentile(latencies, 50) * 1000, 3)
+        result["p99_ms"] = round(percentile(latencies, 99) * 1000, 3)
+    return result
+
+
+def time_per_doc(fn, items):
+    """
+    Call fn on every item. Returns (results, total seconds, per-call latencies).
+    """
+    results, latencies = [], []
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        results.append(fn(item))
+        latencies.append(time.perf_counter() - t0)
+    return results, time.perf_counter() - started, latencies
+
+
+def time_batch(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run_benchmark(files, config):
+    stages = {}
+    n = len(files)
+
+    # 1. Extraction
+    texts, seconds, latencies = time_per_doc(extract_text, files)
+    stages["extract_text"] = summarize(n, seconds, latencies)
+    texts = [t or "" for t in texts]
+
+    # 2. Name extraction
+    names, seconds, latencies = time_per_doc(extract_candidate_name, texts)
+    stages["extract_candidate_name"] = summarize(n, seconds, latencies)
+
+    # 3. Keyword scoring
+    scorer = BasicScorer(config)
+    scored, seconds, latencies = time_per_doc(lambda text: scorer.score(text, JOB_DESCRIPTION), texts)
+    stages["basic_score"] = summarize(n, seconds, latencies)
+
+    # 4. Near-duplicate signatures
+    signatures, seconds, latencies = time_per_doc(text_signature, texts)
+    stages["text_signature"] = summarize(n, seconds, latencies)
+
+    rows = []
+    for path, text, name, (score, notes, status, matches), signature in zip(files, texts, names, scored, signatures):
+        email = next((w for w in text.split() if "@" in w), "")
+        rows.append({
+            "candidate_name": name or "",
+            "email": email,
+            "phone": "",
+            "text_signature": signature,
+            "score": score,
+            "status": status,
+            "reasoning": notes,
+            "matched_keywords": matches,
+            "email_draft": "",
+            "notes": "",
+            "filename": os.path.basename(path),
+        })
+
+    # 5. Duplicate detection
+    df = pd.DataFrame(rows)
+    df, seconds = time_batch(lambda: detect_duplicates(df))
+    stages["detect_duplicates"] = summarize(n, seconds)
+
+    # 6. Excel cleaning
+    df, seconds = time_batch(lambda: clean_dataframe_for_excel(df))
+    stages["clean_dataframe_for_excel"] = summarize(n, seconds)
+
+    # 7. Excel write, through the same sink main.py uses
+    with tempfile.TemporaryDirectory() as tmp:
+        def write_excel():
+            sink = ExcelSink(os.path.join(tmp, "bench.xlsx"))
+            for row in rows:
+                sink.add(row)
+            sink.close()
+        _, seconds = time_batch(write_excel)
+    stages["excel_write"] = summarize(n, seconds)
+
+    return stages
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline, threshold):
+    """
+    Print per-stage throughput against a baseline run. Returns the names of
+    stages that are more than `threshold` slower.
+    """
+    regressions = []
+    print(f"\n{'stage':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    for stage, current in results["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before or not before.get("docs_per_sec") or not current.get("docs_per_sec"):
+            continue
+        change = current["docs_per_sec"] / before["docs_per_sec"] - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(stage)
+            flag = "  REGRESSION"
+        print(f"{stage:<28}{before['docs_per_sec']:>12.1f}{current['docs_per_sec']:>12.1f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline stage by stage")
+    parser.add_argument("--size", type=int, default=1000, help="Corpus size, 100 to 100000 (default: 1000)")
+    parser.add_argument("--formats", nargs="+", default=["pdf", "docx", "txt"], choices=["pdf", "docx", "txt"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="Corpus directory; generated there if missing (default: a temp dir per size/formats/seed)")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown that counts as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    corpus_dir = args.corpus or os.path.join(
+        tempfile.gettempdir(), "resume_analyser_bench", f"{args.size}-{'-'.join(args.formats)}-{args.seed}"
+    )
+    print(f"Preparing corpus of {args.size} resumes in {corpus_dir}...")
+    files = generate_corpus(corpus_dir, args.size, args.formats, args.seed)
+
+    stages = run_benchmark(files, load_config())
+    results = {
+        "meta": {
+            "size": args.size,
+            "formats": args.formats,
+            "seed": args.seed,
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": stages,
+    }
+
+    print(f"\n{'stage':<28}{'docs/sec':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak RSS MB':>14}")
+    for stage, row in stages.items():
+        p50 = "-" if row["p50_ms"] is None else f"{row['p50_ms']:.3f}"
+        p99 = "-" if row["p99_ms"] is None else f"{row['p99_ms']:.3f}"
+        rss = "-" if row["peak_rss_mb"] is None else f"{row['peak_rss_mb']:.1f}"
+        # None when the stage took no measurable time
+        rate = "n/a" if row["docs_per_sec"] is None else f"{row['docs_per_sec']:.1f}"
+        print(f"{stage:<28}{rate:>12}{p50:>10}{p99:>10}{rss:>14}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,120 +1,477 @@
 import argparse
 import os
+import json
+import hashlib
 import pandas as pd
 from datetime import datetime
 import glob
-from src.parser import ResumeParser
-from src.scorer import ResumeScorer
-from src.email_gen import EmailGenerator
+from src.cache import ExtractionCache, LLMResponseCache
 from src.config import load_config
-from src.utils import clean_dataframe_for_excel, detect_duplicates, generate_summary_stats
+from src.email_gen import EmailGenerator
+from src.parser import EXTRACTOR_VERSION, extract_text
+from src.manifest import Manifest
+from src.pipeline import process_files, parse_files
+from src.scorer import ResumeScorer
+from src.sink import ExcelSink, OUTPUT_COLUMNS
+from src.store import CandidateStore
+from src.tracing import Tracer, print_profile_report
+from src.ledger import CostLedger
+from src.dedup import NEAR_DUPLICATE_THRESHOLD
+from src.utils import clean_dataframe_for_excel, detect_duplicates, generate_summary_stats, excel_sheet_name
+
+def load_job_descriptions(jd_dir):
+    """
+    Read every supported file in jd_dir into a dict of position name -> JD text.
+    """
+    job_descriptions = {}
+    for path in sorted(glob.glob(os.path.join(jd_dir, "*.*"))):
+        if os.path.splitext(path)[1].lower() not in [".txt", ".pdf", ".docx"]:
+            continue
+        text = extract_text(path)
+        if text:
+            job_descriptions[os.path.splitext(os.path.basename(path))[0]] = text
+    return job_descriptions
+
+def print_cache_stats(caches, before):
+    """
+    Print per-run hit/miss deltas for each cache snapshotted in `before`.
+    """
+    for label, cache in caches.items():
+        if not cache:
+            continue
+        after = cache.stats()
+        hits = after["hits"] - before[label]["hits"]
+        misses = after["misses"] - before[label]["misses"]
+        line = f"{label} cache: {hits} hits, {misses} misses"
+        saved_mb = (after["bytes_saved"] - before[label]["bytes_saved"]) / (1024 * 1024)
+        if saved_mb:
+            line += f", {saved_mb:.1f} MB not re-parsed"
+        print(line)
+
+def run_fingerprint(jd_text, config, scorer):
+    """
+    Hash of everything besides the file itself that a result depends on, so
+    manifest entries from a different JD or scoring setup are re-scored.
+    """
+    delegate = scorer.delegate
+    scoring_mode = f"{delegate.provider}:{delegate.model}" if scorer.uses_llm else "basic"
+    payload = json.dumps([jd_text, config.get("scoring"), config.get("extraction"), config.get("email_templates"), scoring_mode], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def collect_trace(data, tracer, profiles, ledger):
+    """
+    Move the per-document spans, cost and profile info off a result row into
+    the run's tracer and cost ledger.
+    """
+    spans = data.pop("_spans", None)
+    cost = data.pop("_cost", None)
+    tracer.merge(spans)
+    ledger.add(data, cost, spans)
+    profile = data.pop("_profile", None)
+    if profile:
+        profiles.append(profile)
+
+
+def store_candidate(store, file_path, data, tracer):
+    """
+    Add a parsed result (still carrying raw_text and "_cost") to the
+    candidate store, unless this exact file is already in it.
+    """
+    if store is None or data.get("error"):
+        return
+    with tracer.span("store"):
+        if not store.contains(file_path):
+            store.add(file_path, data, data.get("_cost"))
+
+
+def run_store_search(store, jd_text, config, args, scorer, tracer):
+    """
+    Run the JD against every candidate in the store: one FTS5 query picks
+    the best matches, which are scored and written without opening a file.
+    """
+    from src.pipeline import apply_score
+
+    limit = args.limit or config.get("store", {}).get("search_limit", 100)
+    with tracer.span("store_search"):
+        candidates = store.search(jd_text, limit)
+    print(f"Candidate store: best {len(candidates)} of {len(store)} stored resumes ({tracer.stages['store_search']['seconds']:.3f}s)")
+
+    email_gen = EmailGenerator(config)
+    sink = ExcelSink(args.output, columns=["pool_rank", "pool_score"] + OUTPUT_COLUMNS, dedup_threshold=dedup_threshold(config))
+    with tracer.span("score"):
+        scored = scorer.score_batch([data["raw_text"] for data in candidates], jd_text, sections=[data["sections"] for data in candidates])
+    for data, result in zip(candidates, scored):
+        apply_score(data, result)
+        data.pop("raw_text")
+        with tracer.span("email"):
+            data["email_draft"] = email_gen.generate(data)
+        sink.add(data)
+
+    with tracer.span("dedup"):
+        keys, stats = sink.finalize()
+    if scorer.cascades:
+        stats.update(scorer.cascade_savings())
+    print("\n--- Summary ---")
+    for k, v in stats.items():
+        print(f"{k}: {v}")
+    print("----------------")
+    print(f"Writing results to {args.output}...")
+    with tracer.span("excel_write"):
+        sink.close(keys, stats)
+
+def dedup_threshold(config):
+    return config.get("dedup", {}).get("near_duplicate_threshold", NEAR_DUPLICATE_THRESHOLD)
+
+def run_matrix(files, job_descriptions, config, args, tracer, profiles, ledger, store=None):
+    """
+    Score every resume against every position: parse once, score the whole
+    resumes x positions matrix with sparse products, write one sheet per position.
+    """
+    from src.matrix import JDMatrixScorer
+
+    matrix = JDMatrixScorer(config, job_descriptions)
+    email_gen = EmailGenerator(config)
+    
+    candidates = []
+    for idx, data in enumerate(parse_files(files, config, workers=args.workers)):
+        print(f"[{idx+1}/{len(files)}] Parsed {data['filename']}")
+        store_candidate(store, files[idx], data, tracer)
+        collect_trace(data, tracer, profiles, ledger)
+        # Only the term vector is kept, not the raw text
+        with tracer.span("term_scan"):
+            matrix.add_resume(data.pop("raw_text", "") if not data.get("error") else "")
+        candidates.append(data)
+    
+    print(f"Scoring {len(candidates)} resumes against {len(matrix.positions)} positions...")
+    with tracer.span("matrix_score"):
+        scores, match_pct = matrix.score()
+    
+    base = pd.DataFrame(candidates)
+    errors = base["error"].astype(bool).values
+    position_sheets = {}
+    for j, position in enumerate(matrix.positions):
+        df = base.copy()
+        df["score"] = scores[:, j]
+        df["status"] = [("Error" if err else matrix.status_for(sc)) for err, sc in zip(errors, scores[:, j])]
+        df.loc[errors, "score"] = 0
+        df["reasoning"] = [f"Matched {pct:.1f}% of '{position}' keywords." for pct in match_pct[:, j]]
+        df.loc[errors, "reasoning"] = df.loc[errors, "notes"]
+        df["matched_keywords"] = matrix.matched_keywords(j)
+        with tracer.span("dedup"):
+            position_sheets[position] = detect_duplicates(df, dedup_threshold(config))
+    
+    # Best fit per candidate (errors have no fit)
+    best = scores.argmax(axis=1)
+    base["best_fit_position"] = [("" if err else matrix.positions[b]) for err, b in zip(errors, best)]
+    base["score"] = [(0 if err else scores[i, b]) for i, (err, b) in enumerate(zip(errors, best))]
+    base["status"] = [("Error" if err else matrix.status_for(sc)) for err, sc in zip(errors, base["score"])]
+    with tracer.span("email"):
+        base["email_draft"] = [email_gen.generate(row) for row in base.to_dict("records")]
+    with tracer.span("dedup"):
+        base = detect_duplicates(base, dedup_threshold(config))
+    stats = generate_summary_stats(base)
+    
+    print("\n--- Summary ---")
+    for k, v in stats.items():
+        print(f"{k}: {v}")
+    print("----------------")
+    
+    cols = ["candidate_name", "email", "phone", "best_fit_position", "score", "status", "email_draft", "notes", "duplicate_cluster", "filename"]
+    sheet_cols = ["candidate_name", "email", "phone", "score", "status", "reasoning", "matched_keywords", "notes", "duplicate_cluster", "filename"]
+    
+    print(f"Writing results to {args.output}...")
+    with tracer.span("excel_write"), pd.ExcelWriter(args.output, engine='openpyxl') as writer:
+        clean_dataframe_for_excel(base[[c for c in cols if c in base.columns]]).to_excel(writer, index=False, sheet_name='All Candidates')
+        pd.DataFrame([stats]).to_excel(writer, index=False, sheet_name='Summary')
+        
+        used_names = {'All Candidates', 'Summary'}
+        for position, df in position_sheets.items():
+            df = df.sort_values(by="score", ascending=False)
+            sheet_name = excel_sheet_name(position, used_names)
+            clean_dataframe_for_excel(df[[c for c in sheet_cols if c in df.columns]]).to_excel(writer, index=False, sheet_name=sheet_name)
+
+def run_ranking(files, jd_text, config, args, tracer, profiles, ledger, store=None):
+    """
+    Rank the whole batch against the JD with BM25: parse once, index every
+    resume, keyword-score it for status, then write all candidates in rank
+    order plus a sheet with the best --rank-top.
+    """
+    from src.ranker import BM25Index
+    from src.scorer import BasicScorer
+    from src.pipeline import apply_score
+
+    index = BM25Index.from_config(config)
+    scorer = BasicScorer(config)
+    email_gen = EmailGenerator(config)
+
+    candidates = []
+    for idx, data in enumerate(parse_files(files, config, workers=args.workers)):
+        print(f"[{idx+1}/{len(files)}] Parsed {data['filename']}")
+        store_candidate(store, files[idx], data, tracer)
+        collect_trace(data, tracer, profiles, ledger)
+        text = data.pop("raw_text", "") if not data.get("error") else ""
+        # Only the postings are kept, not the raw text
+        with tracer.span("index"):
+            index.add(data["filename"], text)
+        with tracer.span("score"):
+            apply_score(data, None if data.get("error") else scorer.score(text, jd_text))
+        candidates.append(data)
+
+    with tracer.span("rank"):
+        scores = index.scores(jd_text)
+        top = index.top_k(jd_text, args.rank_top)
+    if args.save_index:
+        index.save(args.save_index)
+        print(f"BM25 index of {len(index)} resumes saved to {args.save_index}")
+
+    df = pd.DataFrame(candidates)
+    df["bm25_score"] = scores.round(4)
+    ranks = {doc_id: rank for rank, (doc_id, _) in enumerate(top, start=1)}
+    df["bm25_rank"] = [ranks.get(name, "") for name in df["filename"]]
+    with tracer.span("email"):
+        df["email_draft"] = [email_gen.generate(row) for row in df.to_dict("records")]
+    with tracer.span("dedup"):
+        df = detect_duplicates(df, dedup_threshold(config))
+    stats = generate_summary_stats(df)
+    df = df.sort_values(by="bm25_score", ascending=False, kind="stable")
+
+    print("\n--- Summary ---")
+    for k, v in stats.items():
+        print(f"{k}: {v}")
+    print(f"--- Top {len(top)} by BM25 ---")
+    for rank, (doc_id, score) in enumerate(top, start=1):
+        print(f"{rank:>4}. {score:8.3f}  {doc_id}")
+    print("----------------")
+
+    cols = ["bm25_rank", "bm25_score", "candidate_name", "email", "phone", "score", "status", "reasoning",
+            "matched_keywords", "email_draft", "notes", "duplicate_cluster", "filename"]
+    print(f"Writing results to {args.output}...")
+    with tracer.span("excel_write"), pd.ExcelWriter(args.output, engine='openpyxl') as writer:
+        ranked = clean_dataframe_for_excel(df[[c for c in cols if c in df.columns]])
+        ranked.to_excel(writer, index=False, sheet_name='All Candidates')
+        pd.DataFrame([stats]).to_excel(writer, index=False, sheet_name='Summary')
+        ranked[ranked["bm25_rank"] != ""].to_excel(writer, index=False, sheet_name=f'Top {args.rank_top}')
+
+def print_ranking(index_path, jd_text, top_k):
+    """
+    Rank a JD against a saved BM25 index without parsing anything.
+    """
+    from src.ranker import BM25Index
+
+    index = BM25Index.load(index_path)
+    print(f"Ranking {len(index)} indexed resumes from {index_path}")
+    for rank, (doc_id, score) in enumerate(index.top_k(jd_text, top_k), start=1):
+        print(f"{rank:>4}. {score:8.3f}  {doc_id}")
+
+def report_trace(tracer, profiles, ledger, args):
+    tracer.print_breakdown()
+    ledger.close()
+    ledger.print_summary()
+    if args.trace_json:
+        tracer.write_json(args.trace_json)
+    if args.trace_prom:
+        tracer.write_prometheus(args.trace_prom)
+    if profiles:
+        print_profile_report(profiles)
 
 def main():
     parser = argparse.ArgumentParser(description="Resume Parser & Scorer CLI")
-    parser.add_argument("-i", "--input", required=True, help="Input directory containing resumes")
-    parser.add_argument("-j", "--job_description", required=True, help="Job description text file or string")
+    parser.add_argument("-i", "--input", help="Input directory containing resumes")
+    jd_group = parser.add_mutually_exclusive_group(required=True)
+    jd_group.add_argument("-j", "--job_description", help="Job description text file or string")
+    jd_group.add_argument("--jd-dir", help="Directory of job descriptions; scores every resume against every position")
     parser.add_argument("-o", "--output", default="output.xlsx", help="Output Excel file path")
+    parser.add_argument("--no-cache", action="store_true", help="Re-extract every file instead of using the extraction cache")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Always call the LLM instead of reusing cached responses")
+    parser.add_argument("--fast", action="store_true", help="Only read the first extraction.fast_pages pages of each PDF")
+    parser.add_argument("-m", "--manifest", help="SQLite manifest of processed files; re-runs skip unchanged resumes and resume after interruptions")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes for parsing and scoring (default: 1, serial)")
+    parser.add_argument("--profile", action="store_true", help="Run cProfile/tracemalloc on a sample of documents and print the hottest functions")
+    parser.add_argument("--profile-rate", type=float, default=0.05, help="Fraction of documents profiled with --profile (default: 0.05)")
+    parser.add_argument("--profile-dir", default="profiles", help="Where --profile writes per-document .prof files")
+    parser.add_argument("--trace-json", help="Write the per-stage timing breakdown to this JSON file")
+    parser.add_argument("--trace-prom", help="Write the per-stage timings in Prometheus text format to this file")
+    parser.add_argument("--rank-top", type=int, default=0, help="Rank the batch with BM25 (rare JD terms weigh more) and list the best N candidates")
+    parser.add_argument("--save-index", help="With --rank-top, save the BM25 index to this .npz file")
+    parser.add_argument("--load-index", help="Rank the JD against a saved BM25 index (no parsing) and print the best --rank-top (default 10)")
+    parser.add_argument("--llm-top", type=int, default=None, help="Scoring cascade: keyword-score every resume and send only the best N to the LLM (overrides scoring.cascade.top_k)")
+    parser.add_argument("--store", help="SQLite candidate store (default: store.path in config.yaml). With -i, parsed resumes are added to it; without -i, the JD is run against every stored candidate")
+    parser.add_argument("--limit", type=int, default=0, help="Without -i, how many of the best-matching stored candidates are scored (default: store.search_limit)")
+    parser.add_argument("--cost-ledger", help="Per-document cost CSV (bytes, pages, extraction time, LLM tokens); default: <output>_cost.csv")
     
     args = parser.parse_args()
     
     # Load Config
     config = load_config()
+    store_path = args.store or config.get("store", {}).get("path")
+    if not args.input and not args.load_index and not store_path:
+        parser.error("-i/--input is required (or --store to search stored candidates)")
+    if args.jd_dir and (args.rank_top or args.load_index or not args.input):
+        parser.error("--jd-dir needs -i and does not combine with --rank-top/--load-index")
+    if args.save_index and not (args.input and args.rank_top):
+        parser.error("--save-index needs -i and --rank-top")
+    if args.rank_top and not (args.input or args.load_index):
+        parser.error("--rank-top needs -i or --load-index; use --limit to size a --store search")
+    if args.limit and args.input:
+        parser.error("--limit applies to --store searches without -i")
+    if args.no_cache:
+        config.setdefault("cache", {})["enabled"] = False
+    if args.no_llm_cache:
+        config.setdefault("cache", {})["llm_enabled"] = False
+    if args.fast:
+        config.setdefault("extraction", {})["fast"] = True
+    if args.llm_top is not None:
+        config.setdefault("scoring", {}).setdefault("cascade", {})["top_k"] = args.llm_top
+    if args.profile:
+        config["profile"] = {"rate": args.profile_rate, "dir": args.profile_dir}
     
-    # Initialize Modules
-    resume_parser = ResumeParser()
+    tracer = Tracer()
+    profiles = []
+    ledger_path = args.cost_ledger or os.path.splitext(args.output)[0] + "_cost.csv"
     
     # Check for API Key in Env
     api_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("GEMINI_API_KEY")
-    if api_key:
-        print("Using LLM for scoring (API Key found)")
+    if args.jd_dir:
+        print("Using Basic Keyword Scoring (multi-position mode)")
+    elif (args.input and args.rank_top) or args.load_index:
+        print("Using BM25 ranking over the whole batch")
+    elif api_key:
+        cascade = config.get("scoring", {}).get("cascade", {}) or {}
+        if cascade.get("top_k") or cascade.get("min_score"):
+            print("Using keyword prefilter + LLM for scoring (API Key found)")
+        else:
+            print("Using LLM for scoring (API Key found)")
     else:
         print("Using Basic Keyword Scoring (No API Key found)")
         
-    scorer = ResumeScorer(config, api_key=api_key)
-    email_gen = EmailGenerator(config)
-    
     # Get JD
-    if os.path.isfile(args.job_description):
+    if args.jd_dir:
+        job_descriptions = load_job_descriptions(args.jd_dir)
+        if not job_descriptions:
+            print(f"No job descriptions found in {args.jd_dir}")
+            return
+        print(f"Loaded {len(job_descriptions)} job descriptions.")
+    elif os.path.isfile(args.job_description):
         with open(args.job_description, "r", encoding="utf-8") as f:
             jd_text = f.read()
     else:
         jd_text = args.job_description
+    
+    if args.load_index:
+        print_ranking(args.load_index, jd_text, args.rank_top or 10)
+        return
+    
+    store = CandidateStore.from_config(config, EXTRACTOR_VERSION, path=args.store)
+    if not args.input:
+        scorer = ResumeScorer(config, api_key=api_key)
+        run_store_search(store, jd_text, config, args, scorer, tracer)
+        scorer.close()
+        tracer.print_breakdown()
+        print("Done!")
+        return
         
     # Get Files
-    files = glob.glob(os.path.join(args.input, "*.*"))
-    supported_exts = [".pdf", ".docx", ".txt"]
-    files = [f for f in files if os.path.splitext(f)[1].lower() in supported_exts]
+    with tracer.span("discover"):
+        files = glob.glob(os.path.join(args.input, "*.*"))
+        supported_exts = [".pdf", ".docx", ".txt"]
+        files = [f for f in files if os.path.splitext(f)[1].lower() in supported_exts]
     
     if not files:
         print(f"No supported files found in {args.input}")
         return
 
-    print(f"Found {len(files)} resumes. Processing...")
+    if args.workers > 1:
+        print(f"Found {len(files)} resumes. Processing with {args.workers} workers...")
+    else:
+        print(f"Found {len(files)} resumes. Processing...")
+    
+    caches = {"Extraction": ExtractionCache.from_config(config, EXTRACTOR_VERSION)}
+    if api_key and not (args.jd_dir or args.rank_top):
+        caches["LLM"] = LLMResponseCache.from_config(config)
+    cache_before = {label: cache.stats() for label, cache in caches.items() if cache}
+    ledger = CostLedger(ledger_path)
+    
+    if args.jd_dir:
+        run_matrix(files, job_descriptions, config, args, tracer, profiles, ledger, store)
+        print_cache_stats(caches, cache_before)
+        report_trace(tracer, profiles, ledger, args)
+        print("Done!")
+        return
     
-    results = []
+    if args.rank_top:
+        run_ranking(files, jd_text, config, args, tracer, profiles, ledger, store)
+        print_cache_stats(caches, cache_before)
+        report_trace(tracer, profiles, ledger, args)
+        print("Done!")
+        return
     
+    scorer = ResumeScorer(config, api_key=api_key)
+    sink = ExcelSink(args.output, dedup_threshold=dedup_threshold(config))
+    email_gen = EmailGenerator(config)
+    
+    # Incremental mode: only new or changed files are processed
+    manifest = Manifest(args.manifest, run_fingerprint(jd_text, config, scorer)) if args.manifest else None
+    todo = files
+    reused = {}
+    if manifest:
+        with tracer.span("manifest"):
+            for f in files:
+                data = manifest.lookup(f)
+                if data is not None:
+                    reused[f] = data
+            todo = [f for f in files if f not in reused]
+    if len(todo) < len(files):
+        print(f"Manifest: {len(files) - len(todo)} unchanged resumes reused, {len(todo)} to process")
+    
+    # Streaming: parse -> score -> email -> sink, one document at a time.
+    # Results come back in file order regardless of worker count, without raw text.
+    # Text is only kept until it is written to the candidate store
+    processed = process_files(todo, jd_text, config, api_key=api_key, workers=args.workers, scorer=scorer, keep_text=store is not None)
     for idx, file_path in enumerate(files):
-        print(f"[{idx+1}/{len(files)}] Processing {os.path.basename(file_path)}...")
-        
-        # Parse
-        data = resume_parser.parse_file(file_path)
-        
-        # Score (only if valid)
-        if not data.get("error"):
-            score, notes, status, matches = scorer.score(data["raw_text"], jd_text)
-            data["score"] = score
-            data["reasoning"] = notes
-            data["status"] = status
-            data["matched_keywords"] = matches
+        if file_path in reused:
+            data = reused.pop(file_path)
         else:
-            data["score"] = 0
-            data["reasoning"] = data.get("notes", "Error")
-            data["status"] = "Error"
-            data["matched_keywords"] = ""
+            # Time the main process spends blocked on the pipeline
+            with tracer.span("pipeline_wait"):
+                data = next(processed)
+            store_candidate(store, file_path, data, tracer)
+            data.pop("raw_text", None)
+            sha256 = (data.get("_cost") or {}).get("sha256")
+            collect_trace(data, tracer, profiles, ledger)
+            print(f"[{idx+1}/{len(files)}] Processed {data['filename']}")
+            # Checkpoint each document; parse errors (timeouts, size limits, crashed
+            # workers) and LLM failures are left out so they are retried
+            if manifest and data.get("status") != "Error" and not str(data.get("reasoning", "")).startswith("LLM Error"):
+                with tracer.span("manifest"):
+                    manifest.record(file_path, data, sha256)
+        with tracer.span("sink"):
+            sink.add(data)
         
-        # Email
-        data["email_draft"] = email_gen.generate(data)
-        
-        results.append(data)
-        
-    # DataFrame Logic
-    df = pd.DataFrame(results)
-    
-    # 1. Duplicate Detection
-    df = detect_duplicates(df)
-    
-    # 2. Summary Stats
-    stats = generate_summary_stats(df)
+    # Duplicate Detection & Summary Stats
+    scorer.close()
+    with tracer.span("dedup"):
+        keys, stats = sink.finalize()
+    # LLM calls and time the scoring cascade saved (also in the Summary sheet)
+    if scorer.cascades:
+        stats.update(scorer.cascade_savings())
     
     print("\n--- Summary ---")
     for k, v in stats.items():
         print(f"{k}: {v}")
+    print_cache_stats(caches, cache_before)
+    if scorer.uses_llm:
+        timings = scorer.delegate.timings
+        print(f"LLM time: {timings['generation']:.1f}s generation, {timings['discovery']:.1f}s model discovery ({timings['discoveries']} lookups)")
+        prompts = scorer.delegate.prompt_savings()
+        if prompts:
+            print(f"LLM prompts: ~{prompts['tokens']} tokens on average, {prompts['reduction_pct']}% fewer than fixed cuts (~{prompts['baseline_tokens']})")
     print("----------------")
     
-    # Formatting columns
-    cols = ["candidate_name", "email", "phone", "score", "status", "reasoning", "matched_keywords", "email_draft", "notes", "filename"]
-    # Reorder if columns match
-    available_cols = [c for c in cols if c in df.columns]
-    df = df[available_cols]
-    
-    # Clean for Export
-    df = clean_dataframe_for_excel(df)
-    
     print(f"Writing results to {args.output}...")
-    with pd.ExcelWriter(args.output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='All Candidates')
-        
-        # Summary Sheet
-        pd.DataFrame([stats]).to_excel(writer, index=False, sheet_name='Summary')
-        
-        if "status" in df.columns:
-            if 'Green' in df['status'].values:
-                df[df['status'] == 'Green'].to_excel(writer, index=False, sheet_name='Shortlisted')
-            if 'Yellow' in df['status'].values:
-                df[df['status'] == 'Yellow'].to_excel(writer, index=False, sheet_name='Under Review')
-            if 'Red' in df['status'].values:
-                df[df['status'] == 'Red'].to_excel(writer, index=False, sheet_name='Rejected')
+    with tracer.span("excel_write"):
+        sink.close(keys, stats)
 
+    report_trace(tracer, profiles, ledger, args)
     print("Done!")
 
 if __name__ == "__main__":
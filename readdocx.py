@@ -2,7 +2,7 @@
 import docx
 
 ###########################
-## Given a path to a word document, extracts the text.  
+## Given a path to a word document (or a binary file-like object), extracts the text.  
 ##  No error checking is done to confirm the file exists
 ##  For python 3, to import docx you need to run pip install python-docx, NOT pip install docx
 ############################
@@ -1,37 +1,68 @@
 import os
 import ntpath
-import win32com.client
+import olefile
 
 ##########
-## Takes a message file (.msg) in, and pull out all attachments.  
+## Outlook .msg files are OLE compound files.  Each attachment is a storage named
+##  __attach_version1.0_#XXXXXXXX holding MAPI properties as streams:
+##    __substg1.0_37010102  attachment data (binary)
+##    __substg1.0_3707001F  long filename (unicode, 001E = ANSI on older files)
+##    __substg1.0_3704001F  short 8.3 filename
+##  Pure python, so it runs anywhere (no Outlook / win32com) and in any worker process
+##########
+ATTACH_PREFIX = "__attach_version1.0_#"
+ATTACH_DATA = "__substg1.0_37010102"
+LONG_FILENAME = ["__substg1.0_3707001F", "__substg1.0_3707001E"]
+SHORT_FILENAME = ["__substg1.0_3704001F", "__substg1.0_3704001E"]
+
+
+def _read_string(ole, storage, streams):
+    for stream in streams:
+        path = storage + "/" + stream
+        if ole.exists(path):
+            data = ole.openstream(path).read()
+            if stream.endswith("001F"):
+                return data.decode("utf-16-le", errors="ignore").rstrip("\x00")
+            return data.decode("latin-1", errors="ignore").rstrip("\x00")
+    return None
+
+
+##########
+## Takes a message file (.msg) in, as a path or bytes, and yields (filename, bytes)
+##  for each attachment.  Nothing is written to disk.
+##  Embedded messages and OLE objects have no data stream and are skipped
+##########
+def iter_msg_attachments(msg_in):
+    with olefile.OleFileIO(msg_in) as ole:
+        storages = sorted(set(entry[0] for entry in ole.listdir(streams=True, storages=True)
+                              if entry[0].startswith(ATTACH_PREFIX)))
+        for storage in storages:
+            data_path = storage + "/" + ATTACH_DATA
+            if not ole.exists(data_path):
+                continue
+            filename = _read_string(ole, storage, LONG_FILENAME) or _read_string(ole, storage, SHORT_FILENAME) or ""
+            yield filename, ole.openstream(data_path).read()
+
+
+##########
+## Takes a message file (.msg) in, and pull out all attachments.
 ##  Attachements will have the same name as the message file, with the count and correct extension
-##  Returns a list of attachments found
+##  Returns a list of (attachment name, attachment bytes)
 ##########
 def get_msg_attachment(msg_in):
     msg_in = os.path.abspath(msg_in)
-    folder = os.path.dirname(msg_in)
-    
-    filenames = []
-    try:
-        outlook = win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
-        msg = outlook.OpenSharedItem(msg_in)        #filename including path
-        att = msg.Attachments
 
-        count = 0;
-        for attachment in att:
-            filename, file_extension = os.path.splitext(str(attachment))
+    attachments = []
+    try:
+        count = 0
+        for filename, data in iter_msg_attachments(msg_in):
+            file_extension = os.path.splitext(filename)[1]
             file_out = ntpath.basename(msg_in).replace(".msg", "_" + str(count) + file_extension.lower())
-            
-            filename = os.path.join(folder, file_out)
-            attachment.SaveAsFile(filename)
-            filenames.append(filename)
-            
-            count += 1
+            attachments.append((file_out, data))
 
-        del outlook, msg
+            count += 1
     except Exception as e:
         print("Failed to read file " + msg_in)
         print(e)
-    
-    return filenames
-    
\ No newline at end of file
+
+    return attachments
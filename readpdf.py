@@ -3,124 +3,216 @@ import cv2
 try:
     import fitz
 except:
+    fitz = None
     print("Failed to import fitz.  Reading images from PDF will not be available.")
 import sys,  re
+import io
+import atexit
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 from PIL import Image
 
 import pytesseract
 from pytesseract import image_to_string
 
-from pdfminer.pdfparser import PDFParser, PDFDocument
-from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer.converter import PDFPageAggregator
-from pdfminer.layout import LAParams, LTTextBox, LTTextLine
+from src import extractors
+from src.cache import OCRCache
+from src.config import load_config
+
+# Text layer backends tried in order; pdfminer-layout keeps the char/word
+# margins this script has always used. See `python -m src.extractors list`.
+PDF_BACKENDS = ["pdfminer-layout", "pymupdf", "pypdf"]
+
+# Alter the tesseract install location if required; ignored when not present
+TESSERACT_CMD = r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe'
+TESSDATA_DIR = r'C:\Program Files (x86)\Tesseract-OCR\tessdata'
+TESSERACT_LANG = 'eng'
+
+# Scanned pages are OCR'd in parallel across this many processes
+OCR_WORKERS = os.cpu_count() or 1
+
+_ocr_pool = None
+
+# OCRCache from config.yaml, created on first use; set_ocr_cache(None) disables it
+_ocr_cache = False
 
 
 ###################
 ## Requires Fitz
 ##  
-## Get Images out of PDF.  Takes in path to PDF
-##  Returns list of path to images, with the same name as the PDF, with '.pdf' converted to image count and ".png"
+## Get Images out of one PDF page, in memory.  Takes in an open fitz document and page number
+##  Returns list of numpy arrays (height x width x channels), already flipped upright
 ###################
-def get_pdf_images(pdf_file):
-    checkXO = r"/Type(?= */XObject)"       # finds "/Type/XObject"   
-    checkIM = r"/Subtype(?= */Image)"      # finds "/Subtype/Image"
-
-    doc = fitz.open(pdf_file)
-    imgcount = 0
-    lenXREF = doc._getXrefLength()         # number of objects - do not use entry 0!
-    
-    img_files = []
-
-    for i in range(1, lenXREF):            # scan through all objects
-        text = doc._getObjectString(i)     # string defining the object
-        isXObject = re.search(checkXO, text)    # tests for XObject
-        isImage   = re.search(checkIM, text)    # tests for Image
-        if not isImage:
-            isImage = "/Subtype/Image" in text
-        if not isXObject and not isImage:   # not an image object if not both True
-            continue
-        imgcount += 1
-        pix = fitz.Pixmap(doc, i)          # make pixmap from image
-        
-        filename = pdf_file.replace(".pdf", "") + "-%s.png" % (i,)
-        if pix.n < 5:                      # can be saved as PNG
-            pix.writePNG(filename)
-        else:                              # must convert the CMYK first
-            pix0 = fitz.Pixmap(fitz.csRGB, pix)
-            pix.writePNG(filename)
-            pix0 = None                    # free Pixmap resources
-            
-        reverse_image(filename)
-        img_files.append(filename)
+def get_page_images(doc, page_number):
+    images = []
+    for img in doc.load_page(page_number).get_images(full=True):
+        pix = fitz.Pixmap(doc, img[0])     # make pixmap from image xref
+        if pix.n - pix.alpha >= 4:         # must convert the CMYK first
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        img_data = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        images.append(reverse_image(img_data))
         pix = None                         # free Pixmap resources
+    return images
+
 
-    return img_files
-    
-    
 ###############
 ## Requires cv2
 ##  The Images read in from PDF are reversed in the y direction
-##  Reads in the provided PNG file, reverses the axis, and writes to the same filename
+##  Takes the image array and returns it flipped back
 ###############    
-def reverse_image(filename):
-    img = cv2.imread(filename)
-    
+def reverse_image(img):
     #rimg=cv2.flip(img,1)
-    fimg=cv2.flip(img,0)
-    cv2.imwrite(filename, fimg)
+    return cv2.flip(img, 0)
     
 
+def get_ocr_cache():
+    global _ocr_cache
+    if _ocr_cache is False:
+        _ocr_cache = OCRCache.from_config(load_config())
+    return _ocr_cache
+
+
+def set_ocr_cache(cache):
+    global _ocr_cache
+    _ocr_cache = cache
+
+
+def ocr_cache_enabled():
+    # False until first use means "from config.yaml"; only None is an explicit opt-out
+    return _ocr_cache is not None
+
+
+###############
+## Pool initializer.  Under spawn/forkserver (macOS, Windows) a worker starts
+##  from a fresh import of this module, so settings changed in the parent
+##  (set_ocr_cache(None) for --no-ocr-cache, the OCR process budget) are
+##  passed in explicitly
+###############
+def init_worker(ocr_cache=True, ocr_workers=None):
+    global OCR_WORKERS
+    if not ocr_cache:
+        set_ocr_cache(None)
+    # Inside a pool of N readers each gets 1/N of the OCR processes
+    if ocr_workers is not None:
+        OCR_WORKERS = ocr_workers
+
+
 #################
 ## Requires tesseract to be installed, as well as the pytesseract library
-##   Alter the tesseract install location if required
+##   Alter the tesseract install location at the top of the file if required
 ##  
-##  Input is an image
+##  Input is an image: a numpy array, PIL image or path to an image file
 ##  Output is a string of all text in image
 #################
 def get_text_from_image(image_in):
-    tessdata_dir_config = r'--tessdata-dir "C:\Program Files (x86)\Tesseract-OCR\tessdata"'
-    pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe'
+    config = ''
+    if os.path.isfile(TESSERACT_CMD):
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+        config = '--tessdata-dir "%s"' % TESSDATA_DIR
+    
+    if isinstance(image_in, str):
+        if not os.path.isfile(image_in):
+            return ""
+        image_in = Image.open(image_in)
+    img_data = np.ascontiguousarray(image_in)
     
-    if os.path.isfile(image_in):
-        image_data = Image.open(image_in)
-        return image_to_string(image_data, lang='eng',  config=tessdata_dir_config)
+    ###############
+    ## Same pixels, language and config -> same text, so look in the OCR cache first
+    cache = get_ocr_cache()
+    key = None
+    if cache is not None:
+        key = OCRCache.key_for(img_data.data, img_data.shape, img_data.dtype, TESSERACT_LANG, config)
+        text = cache.get(key, image_size=img_data.nbytes)
+        if text is not None:
+            return text
+    
+    text = image_to_string(Image.fromarray(img_data), lang=TESSERACT_LANG, config=config)
+    if cache is not None:
+        cache.put(key, text)
+    return text
+
+
+###############
+## Requires Fitz
+##  Opens a PDF given as a path or as the file's bytes
+###############
+def open_pdf(pdf_file):
+    if isinstance(pdf_file, str):
+        return fitz.open(pdf_file)
+    return fitz.open(stream=bytes(pdf_file), filetype="pdf")
+
+
+###############
+## OCR every image on one page.  Runs in a worker process, so it opens the PDF itself
+###############
+def ocr_page(pdf_file, page_number):
+    with open_pdf(pdf_file) as doc:
+        return "".join(get_text_from_image(img) for img in get_page_images(doc, page_number))
+
+
+def _get_ocr_pool():
+    global _ocr_pool
+    if _ocr_pool is None:
+        _ocr_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=init_worker, initargs=(ocr_cache_enabled(), 1))
+        atexit.register(_ocr_pool.shutdown)
+    return _ocr_pool
+
+
+###############
+## Requires Fitz
+##  Pages without a text layer (scanned), by page number
+###############
+def get_scanned_pages(pdf_file):
+    with open_pdf(pdf_file) as doc:
+        return [i for i in range(doc.page_count) if not doc.load_page(i).get_text().strip()]
+
+
+###############
+## OCR the given pages, in parallel when there is more than one
+##  Returns one text per page, in the order given
+###############
+def ocr_pages(pdf_file, page_numbers):
+    if len(page_numbers) <= 1 or OCR_WORKERS <= 1:
+        return [ocr_page(pdf_file, i) for i in page_numbers]
+    pool = _get_ocr_pool()
+    return list(pool.map(ocr_page, [pdf_file] * len(page_numbers), page_numbers))
         
         
 ######################
-## Requires PDFMiner3k
+## Uses the extractor registry in src/extractors.py
 ##
-##  Takes a PDF file in, and returns a string of all the text.
+##  Takes a PDF file in (a path, or the file's bytes e.g. a .msg attachment),
+##  and returns a string of all the text.
 ######################
 def get_pdf_text(pdf_file):
-    pdf_text = ""
-    
-    with open(pdf_file, 'rb') as file_hdl:
-                
-        parser = PDFParser(file_hdl)
-        doc = PDFDocument()
-        parser.set_document(doc)
-        doc.set_parser(parser)
-        doc.initialize('')
-        
-        rsrcmgr = PDFResourceManager()
-        laparams = LAParams()
-        laparams.char_margin = 1.0
-        laparams.word_margin = 1.0
-        device = PDFPageAggregator(rsrcmgr, laparams=laparams)
-        interpreter = PDFPageInterpreter(rsrcmgr, device)
-
-        for page in doc.get_pages():
-            interpreter.process_page(page)
-            layout = device.get_result()
-            for lt_obj in layout:
-                if isinstance(lt_obj, LTTextBox) or isinstance(lt_obj, LTTextLine):
-                    pdf_text += lt_obj.get_text()
+    try:
+        if isinstance(pdf_file, str):
+            pdf_text = extractors.extract(pdf_file, chain=PDF_BACKENDS)
+        else:
+            pdf_text = extractors.extract(io.BytesIO(pdf_file), chain=PDF_BACKENDS, ext=".pdf")
+    except Exception as e:
+        print("Failed to read text layer of %s: %s" % (pdf_file if isinstance(pdf_file, str) else "PDF", e))
+        pdf_text = ""
     
-    if len(pdf_text) == 0:
-        img_files = get_pdf_images(pdf_file)
-        for img_file in img_files:
-            pdf_text += get_text_from_image(img_file)
+    ###############
+    ## OCR only the pages that have no text layer
+    if fitz is None:
+        return pdf_text
+    try:
+        scanned = get_scanned_pages(pdf_file)
+        if scanned:
+            ###############
+            ## Every backend ends a page with a form feed; OCR text goes in
+            ##  the scanned page's slot so mixed documents keep page order
+            pages = pdf_text.split("\f")
+            for page_number, text in zip(scanned, ocr_pages(pdf_file, scanned)):
+                if page_number < len(pages) - 1:
+                    pages[page_number] += text
+                else:
+                    pages[-1] += text
+            pdf_text = "\f".join(pages)
+    except Exception as e:
+        print("Failed to OCR %s: %s" % (pdf_file, e))
     
     return pdf_text
@@ -6,6 +6,7 @@ except:
 import readpdf
 import readdocx
 
+import io
 import os
 import re
 import sys
@@ -16,6 +17,9 @@ import ntpath
 import argparse
 import collections
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from src.manifest import Manifest
 
 stop_list = [ "a", "about", "above", "after", "again", "against", "all", "am", "an", "and", "any", "are", "as", "at", "be", "because", "been", "before", "being", "below", "between", "both", "but", "by", "could", "did", "do", "does", "doing", "down", "during", "each", "few", "for", "from", "further", "had", "has", "have", "having", "he", "he'd", "he'll", "he's", "her", "here", "here's", "hers", "herself", "him", "himself", "his", "how", "how's", "i", "i'd", "i'll", "i'm", "i've", "if", "in", "into", "is", "it", "it's", "its", "itself", "let's", "me", "more", "most", "my", "myself", "nor", "of", "on", "once", "only", "or", "other", "ought", "our", "ours", "ourselves", "out", "over", "own", "same", "she", "she'd", "she'll", "she's", "should", "so", "some", "such", "than", "that", "that's", "the", "their", "theirs", "them", "themselves", "then", "there", "there's", "these", "they", "they'd", "they'll", "they're", "they've", "this", "those", "through", "to", "too", "under", "until", "up", "very", "was", "we", "we'd", "we'll", "we're", "we've", "were", "what", "what's", "when", "when's", "where", "where's", "which", "while", "who", "who's", "whom", "why", "why's", "with", "would", "you", "you'd", "you'll", "you're", "you've", "your", "yours", "yourself", "yourselves" ]
 
@@ -24,52 +28,111 @@ undesirable = ["highschool", "high school"]
 
 output_excel_prefix = "Developer_Resumes_"
 
-def get_text_from_files(filelist, existing_df):
+def get_resume_key(file):
+    fn_key = ntpath.basename(file)
+    return fn_key.replace("New Candidate ", "").split (" for ")[0]
+
+
+###############
+## Text of one document given as bytes (a .msg attachment), by extension
+###############
+def get_text_from_bytes(name, data):
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".pdf":
+        return readpdf.get_pdf_text(data)
+    elif ext == ".docx":
+        return readdocx.getDocxText(io.BytesIO(data))
+    print ("Skipping attachment type ", ext)
+    return None
+
+
+###############
+## Read one file.  Returns a list of (resume id, text): one entry for a resume,
+##  one per supported attachment for a .msg file, none if unreadable
+###############
+def read_file_texts(file):
+    ###############
+    ## if msg, read the attachments straight from the message, in memory
+    if file.lower().endswith(".msg"):
+        texts = []
+        for att_name, data in readmsg.get_msg_attachment(file):
+            text = get_text_from_bytes(att_name, data)
+            if type(text) == str:
+                texts.append((get_resume_key(att_name), text))
+        return texts
+    
+    text = None
+    ###############
+    ## if PDF, read PDF text
+    if file.lower().endswith(".pdf"):
+        text = readpdf.get_pdf_text(file)
+        
+    ###############
+    ## if word doc, read word text
+    elif file.lower().endswith(".docx"):
+        text = readdocx.getDocxText(file)
+        
+    else: 
+        f, f_ext = os.path.splitext(file)
+        print ("Skipping file type ", f_ext)
+    
+    if type(text) == str:
+        return [(get_resume_key(file), text)]
+    return []
+
+
+def get_text_from_files(filelist, existing_df, manifest=None, workers=1):
 
     file_text_dict = {}
     
-    idx = 0
-    while idx < len(filelist):
-        file = filelist[idx]
-        idx += 1
-        
-        fn_key = ntpath.basename(file)
-        fn_key = fn_key.replace("New Candidate ", "").split (" for ")[0]
+    # Resume ids already in the spreadsheet, as a set for O(1) lookups
+    existing_keys = set()
+    if not existing_df is None:
+        existing_keys = set(existing_df.iloc[:, 0])
+    
+    todo = []
+    for file in filelist:
+        fn_key = get_resume_key(file)
         
-        #any(df.column == 07311954)
-        if (not existing_df is None) and any(existing_df.iloc[:, 0] == fn_key):
+        if fn_key in existing_keys:
             print("Skipping", fn_key)
             continue
         
-        text = None
         ###############
-        ## if msg, get attachments
-        ##  add attachment to filelist
-        if file.lower().endswith(".msg"):
-            attachments = readmsg.get_msg_attachment(file)
-            if attachments and len(attachments) > 0:
-                for att in attachments:
-                    if not att in filelist:
-                        filelist.append(att)
-            
+        ## Text already extracted by an earlier (possibly interrupted) run
+        if manifest is not None:
+            cached = manifest.lookup(file)
+            if cached is not None:
+                for key, text in cached["texts"]:
+                    file_text_dict[key] = text
+                continue
         
-        ###############
-        ## if PDF, read PDF text
-        elif file.lower().endswith(".pdf"):
-            text = readpdf.get_pdf_text(file)
-            
-        ###############
-        ## if word doc, read word text
-        elif file.lower().endswith(".docx"):
-            text = readdocx.getDocxText(file)
-            
-        else: 
-            f, f_ext = os.path.splitext(file)
-            print ("Skipping file type ", f_ext)
-    
-    
-        if type(text) == str:
-            file_text_dict[fn_key] = text
+        todo.append(file)
+    
+    ###############
+    ## Files are independent, so with workers > 1 they are read in parallel
+    if workers > 1 and len(todo) > 1:
+        # Readers share the OCR budget, so a run stays at about one process per CPU
+        ocr_workers = max(1, readpdf.OCR_WORKERS // workers)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=readpdf.init_worker,
+                                       initargs=(readpdf.ocr_cache_enabled(), ocr_workers))
+        results = executor.map(read_file_texts, todo)
+    else:
+        executor = None
+        results = map(read_file_texts, todo)
+    
+    try:
+        for file, texts in zip(todo, results):
+            for key, text in texts:
+                if key in existing_keys:
+                    print("Skipping", key)
+                    continue
+                file_text_dict[key] = text
+            if manifest is not None and texts:
+                manifest.record(file, {"texts": texts})
+    finally:
+        if executor is not None:
+            executor.shutdown()
             
     return file_text_dict
     
@@ -190,7 +253,18 @@ def create_excel_output(resume_dict_list, existing_df, folder):
 
     writer.save()
     
-def resume_parser(file_list, input_dir, existing_excel=None):
+def print_ocr_cache_stats(before):
+    cache = readpdf.get_ocr_cache()
+    if cache is None:
+        return
+    after = cache.stats()
+    hits = after["hits"] - before["hits"]
+    misses = after["misses"] - before["misses"]
+    if hits + misses:
+        print("OCR cache: %d hits, %d misses (%.0f%% hit rate), %d entries, %d evictions" % (
+            hits, misses, 100.0 * hits / (hits + misses), after["entries"], after["evictions"] - before["evictions"]))
+    
+def resume_parser(file_list, input_dir, existing_excel=None, manifest_path=None, workers=1):
     
     #######################
     ## Read existing file
@@ -201,8 +275,15 @@ def resume_parser(file_list, input_dir, existing_excel=None):
     
     #######################
     ## Process files
+    manifest = Manifest(manifest_path, "legacy-texts") if manifest_path else None
+    
+    ocr_cache = readpdf.get_ocr_cache()
+    ocr_before = ocr_cache.stats() if ocr_cache is not None else None
+    
     print("Reading Resume Text for", len(file_list), "files")
-    file_text_map = get_text_from_files(file_list, existing_df)
+    file_text_map = get_text_from_files(file_list, existing_df, manifest, workers)
+    if ocr_before is not None:
+        print_ocr_cache_stats(ocr_before)
     
     resume_dict_list = []
     for resume_id, resume in file_text_map.items():
@@ -223,6 +304,9 @@ def main(argv):
     parser = argparse.ArgumentParser(description='Create Resume Triage Spreadsheet')
     parser
     parser.add_argument("-x", "--existingExcel", help="Previously created excel to update", default=None)
+    parser.add_argument("-m", "--manifest", help="SQLite manifest checkpointing extracted text, so interrupted runs resume", default=None)
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Read files (including .msg attachments) in N parallel processes")
+    parser.add_argument("--no-ocr-cache", action="store_true", help="OCR every scanned image, ignoring cached OCR text")
     
     requiredNamed = parser.add_argument_group('required named arguments')
     requiredNamed.add_argument("-i", "--inputDir", help="Directory containing resumes (pdf and .docx) or .msg files", required=True)
@@ -231,6 +315,8 @@ def main(argv):
     
     input_dir = args.inputDir
     existing_excel = args.existingExcel
+    if args.no_ocr_cache:
+        readpdf.set_ocr_cache(None)
     
     if input_dir is None:
         parser.print_help()
@@ -277,7 +363,7 @@ def main(argv):
     #####################
     ## Call the API
     #####################
-    resume_parser(file_list, input_dir, existing_excel)
+    resume_parser(file_list, input_dir, existing_excel, args.manifest, args.workers)
     
     return 
 
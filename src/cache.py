@@ -0,0 +1,387 @@
+import os
+import time
+import hashlib
+import sqlite3
+import weakref
+import threading
+import multiprocessing.util
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "resume_analyser")
+
+
+def get_cache_dir(config):
+    return os.path.expanduser(config.get("cache", {}).get("dir") or DEFAULT_CACHE_DIR)
+
+
+def cache_enabled(config):
+    return config.get("cache", {}).get("enabled", True)
+
+
+def hash_file(file_path, chunk_size=1 << 20):
+    """
+    SHA-256 of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_buffer(data):
+    """
+    SHA-256 of an in-memory document: bytes, a memoryview or a BytesIO-like
+    object. Buffers are hashed in place, not copied.
+    """
+    if hasattr(data, "getbuffer"):
+        with data.getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        position = data.tell()
+        data.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: data.read(1 << 20), b""):
+            digest.update(chunk)
+        data.seek(position)
+        return digest.hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+class DiskCache:
+    """
+    Persistent key/value store backed by SQLite.
+    Entries are evicted least-recently-used first once the total stored size
+    exceeds max_bytes, and treated as misses once older than ttl seconds.
+    SQLite's file locking makes the cache safe to share between worker
+    processes; each process and thread opens its own connection.
+    """
+
+    # Hits, misses and access times are counted in memory and written in one
+    # transaction at most every FLUSH_SECONDS or FLUSH_EVERY lookups, so reads
+    # do not take the write lock
+    FLUSH_EVERY = 256
+    FLUSH_SECONDS = 2.0
+
+    # Live instances, so stats() can flush every one sharing its file
+    _instances = weakref.WeakSet()
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._accessed = {}
+        self._pending = 0
+        self._flushed = time.monotonic()
+        DiskCache._instances.add(self)
+        # Runs at interpreter exit, and at worker-process exit in multiprocessing pools
+        multiprocessing.util.Finalize(self, DiskCache._flush_state, args=(self.path, self._counts, self._accessed, self._lock), exitpriority=10)
+
+    def _connect(self):
+        # Connections must not cross a fork or be shared between threads
+        # (sqlite3's same-thread check), so each thread of each process opens its own
+        local = self._local
+        if getattr(local, "conn", None) is None or local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value TEXT, size INTEGER,"
+                " created REAL, last_access REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+            local.conn = conn
+            local.pid = os.getpid()
+        return local.conn
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent workers
+        # serialize on the busy timeout instead of failing mid-transaction
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _bump(conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, key, saved_bytes=0):
+        """
+        Return the cached value or None. saved_bytes is credited to the
+        'bytes_saved' counter on a hit.
+        """
+        row = self._connect().execute("SELECT value, size, created FROM entries WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is not None and self.ttl is not None and row[2] + self.ttl < now:
+            with self._transaction() as conn:
+                # Re-check: another process may have replaced it meanwhile
+                if conn.execute("DELETE FROM entries WHERE key = ? AND created = ?", (key, row[2])).rowcount:
+                    self._bump(conn, "stored_bytes", -row[1])
+                    self._bump(conn, "expired")
+            row = None
+        with self._lock:
+            if row is None:
+                self._counts["misses"] += 1
+            else:
+                self._counts["hits"] += 1
+                self._counts["bytes_saved"] += saved_bytes
+                self._accessed[key] = now
+            self._pending += 1
+            due = self._pending >= self.FLUSH_EVERY or time.monotonic() - self._flushed >= self.FLUSH_SECONDS
+        if due:
+            self.flush()
+        return row[0] if row is not None else None
+
+    def flush(self):
+        """
+        Write the buffered counters and access times.
+        """
+        with self._lock:
+            self._pending = 0
+            self._flushed = time.monotonic()
+        self._write_state(self._connect(), self._counts, self._accessed, self._lock)
+
+    @staticmethod
+    def _write_state(conn, counts, accessed, lock):
+        with lock:
+            if not counts and not accessed:
+                return
+            counts_now, accessed_now = dict(counts), list(accessed.items())
+            counts.clear()
+            accessed.clear()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("UPDATE entries SET last_access = max(last_access, ?) WHERE key = ?",
+                             [(t, key) for key, t in accessed_now])
+            for name, amount in counts_now.items():
+                DiskCache._bump(conn, name, amount)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _flush_state(path, counts, accessed, lock):
+        # Exit-time flush on a fresh connection: the instance may be gone
+        # and its connection may belong to another thread
+        if not counts and not accessed:
+            return
+        try:
+            conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+            try:
+                DiskCache._write_state(conn, counts, accessed, lock)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    def put(self, key, value):
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        with self._transaction() as conn:
+            old = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._bump(conn, "stored_bytes", size - (old[0] if old else 0))
+            self._evict(conn)
+
+    def delete(self, key):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._bump(conn, "stored_bytes", -row[0])
+
+    def _evict(self, conn):
+        # Running total is kept in counters so a put does not have to SUM the table
+        total = conn.execute("SELECT value FROM counters WHERE name = 'stored_bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% of the budget so we are not evicting on every subsequent put
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        cursor = conn.execute("SELECT key, size FROM entries ORDER BY last_access")
+        victims = []
+        for key, size in cursor:
+            if total - freed <= target:
+                break
+            victims.append((key,))
+            freed += size
+        cursor.close()
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._bump(conn, "stored_bytes", -freed)
+        self._bump(conn, "evictions", len(victims))
+
+    def stats(self):
+        for cache in list(DiskCache._instances):
+            if cache.path == self.path:
+                cache.flush()
+        conn = self._connect()
+        stats = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "hits": stats.get("hits", 0),
+            "misses": stats.get("misses", 0),
+            "bytes_saved": stats.get("bytes_saved", 0),
+            "evictions": stats.get("evictions", 0),
+            "expired": stats.get("expired", 0),
+            "entries": entries,
+            "stored_bytes": stats.get("stored_bytes", 0),
+        }
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache of extracted resume text.
+    Keys combine the SHA-256 of the file bytes with the extractor version, so
+    renamed or moved files still hit and an extractor upgrade invalidates
+    everything it produced.
+    """
+
+    def __init__(self, cache_dir, extractor_version, max_bytes=512 * 1024 * 1024):
+        self.extractor_version = extractor_version
+        self.store = DiskCache(os.path.join(cache_dir, "extraction.sqlite"), max_bytes=max_bytes)
+
+    @classmethod
+    def from_config(cls, config, extractor_version):
+        if not cache_enabled(config):
+            return None
+        max_mb = config.get("cache", {}).get("extraction_max_mb", 512)
+        return cls(get_cache_dir(config), extractor_version, max_bytes=max_mb * 1024 * 1024)
+
+    def key_for(self, file_path, variant="", digest=None):
+        # Pass `digest` (see hash_buffer) for documents that are not on disk;
+        # file_path then only supplies the extension
+        ext = os.path.splitext(file_path)[1].lower()
+        return f"{digest or hash_file(file_path)}:{ext}:{self.extractor_version}:{variant}"
+
+    def get(self, key, size):
+        # size: bytes of the source document, counted as saved on a hit
+        return self.store.get(key, saved_bytes=size)
+
+    def put(self, key, text):
+        self.store.put(key, text)
+
+    def stats(self):
+        return self.store.stats()
+
+
+class OCRCache:
+    """
+    Cache of OCR text keyed on a hash of the decoded image pixels (with shape
+    and dtype) plus the tesseract language and config. The same scan embedded
+    in a different PDF, or forwarded under another name, is not OCR'd again.
+    """
+
+    def __init__(self, cache_dir, max_bytes=128 * 1024 * 1024):
+        self.store = DiskCache(os.path.join(cache_dir, "ocr.sqlite"), max_bytes=max_bytes)
+
+    @classmethod
+    def from_config(cls, config):
+        cache_config = config.get("cache", {})
+        if not cache_enabled(config) or not cache_config.get("ocr_enabled", True):
+            return None
+        return cls(get_cache_dir(config), max_bytes=cache_config.get("ocr_max_mb", 128) * 1024 * 1024)
+
+    @staticmethod
+    def key_for(pixels, shape, dtype, lang, tess_config):
+        digest = hashlib.sha256(f"{tuple(shape)}:{dtype}:".encode("utf-8"))
+        digest.update(pixels)
+        return f"{digest.hexdigest()}:{lang}:{hashlib.sha256(tess_config.encode('utf-8')).hexdigest()[:16]}"
+
+    def get(self, key, image_size=0):
+        return self.store.get(key, saved_bytes=image_size)
+
+    def put(self, key, text):
+        self.store.put(key, text)
+
+    def stats(self):
+        return self.store.stats()
+
+
+class LLMResponseCache:
+    """
+    Cache of raw LLM responses keyed on provider, model, temperature, the
+    whitespace-normalized prompt and a hash of the full resume text.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024, ttl=None):
+        self.store = DiskCache(os.path.join(cache_dir, "llm_responses.sqlite"), max_bytes=max_bytes, ttl=ttl)
+
+    @classmethod
+    def from_config(cls, config):
+        cache_config = config.get("cache", {})
+        if not cache_enabled(config) or not cache_config.get("llm_enabled", True):
+            return None
+        ttl_days = cache_config.get("llm_ttl_days", 30)
+        return cls(
+            get_cache_dir(config),
+            max_bytes=cache_config.get("llm_max_mb", 256) * 1024 * 1024,
+            ttl=ttl_days * 86400 if ttl_days else None,
+        )
+
+    @staticmethod
+    def key_for(provider, model, temperature, prompt, resume_text):
+        normalized_prompt = " ".join(prompt.split())
+        parts = [
+            provider,
+            model,
+            repr(float(temperature or 0)),
+            hashlib.sha256(normalized_prompt.encode("utf-8")).hexdigest(),
+            hashlib.sha256(resume_text.encode("utf-8")).hexdigest(),
+        ]
+        return ":".join(parts)
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def put(self, key, response):
+        self.store.put(key, response)
+
+    def stats(self):
+        return self.store.stats()
+
+
+class ModelDiscoveryCache:
+    """
+    Remembers which provider model last worked, so new processes and later
+    runs skip model discovery until the entry expires or the model fails.
+    """
+
+    def __init__(self, cache_dir, ttl=None):
+        self.store = DiskCache(os.path.join(cache_dir, "llm_models.sqlite"), max_bytes=1024 * 1024, ttl=ttl)
+
+    @classmethod
+    def from_config(cls, config):
+        ttl_hours = config.get("llm", {}).get("model_cache_ttl_hours", 24)
+        if not ttl_hours:
+            return None
+        return cls(get_cache_dir(config), ttl=ttl_hours * 3600)
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def put(self, key, model_name):
+        self.store.put(key, model_name)
+
+    def delete(self, key):
+        self.store.delete(key)
@@ -0,0 +1,259 @@
+import re
+import zlib
+import base64
+
+import numpy as np
+
+# Word 3-gram shingles, 128 MinHash permutations split into 16 LSH bands of 8
+# rows: pairs at Jaccard 0.85 share a band with probability ~0.994 (0.9999 at
+# 0.9), resumes built on a shared template (~0.67) with probability ~0.5 and
+# pairs at 0.3 almost never, and every candidate pair is then checked against
+# the threshold on the full signature.
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+BANDS = 16
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+# Distinct clusters a row is checked against per LSH bucket. Bounds the work
+# when many resumes that fall short of the threshold share a bucket.
+BUCKET_REPRESENTATIVES = 8
+
+_MERSENNE = (1 << 61) - 1
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, _MERSENNE, NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, _MERSENNE, NUM_PERM, dtype=np.uint64)
+_CHUNK = 4096
+
+
+def shingle_hashes(text, k=SHINGLE_WORDS):
+    """
+    CRC32 of every distinct k-word shingle of the lowercased text. CRC32
+    rather than hash() so every worker process agrees on the values.
+    """
+    words = re.findall(r"\w+", text.lower())
+    grams = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))} if words else set()
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(text):
+    """
+    MinHash signature (NUM_PERM uint32 values) of the text's shingles, or
+    None if it has no words.
+    """
+    hashes = shingle_hashes(text or "")
+    if not hashes.size:
+        return None
+    signature = np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint64)
+    for start in range(0, hashes.size, _CHUNK):
+        chunk = hashes[start:start + _CHUNK]
+        # (a * x + b) mod p, wrapping in uint64 like datasketch
+        values = ((np.outer(chunk, _A) + _B) % _MERSENNE) & np.uint64(0xFFFFFFFF)
+        signature = np.minimum(signature, values.min(axis=0))
+    return signature.astype(np.uint32)
+
+
+def text_signature(text):
+    """
+    The MinHash signature as a short ASCII string, so it can ride on result
+    rows through JSON (manifest, sink spool) after the raw text is dropped.
+    """
+    signature = minhash(text)
+    if signature is None:
+        return ""
+    return base64.b64encode(signature.astype("<u4").tobytes()).decode("ascii")
+
+
+def decode_signature(value):
+    # Already decoded (e.g. read back from ExcelSink's signature spool)
+    if isinstance(value, np.ndarray):
+        return value if value.size == NUM_PERM else None
+    if not isinstance(value, str) or not value:
+        return None
+    signature = np.frombuffer(base64.b64decode(value), dtype="<u4")
+    # Written with a different NUM_PERM; not comparable
+    return signature if signature.size == NUM_PERM else None
+
+
+def similarity(a, b):
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def band_hashes(signatures):
+    """
+    One uint64 per LSH band for each row of an (n, NUM_PERM) signature array.
+    """
+    rows = NUM_PERM // BANDS
+    bands = signatures.reshape(len(signatures), BANDS, rows).astype(np.uint64)
+    hashes = np.zeros((len(signatures), BANDS), dtype=np.uint64)
+    for r in range(rows):
+        # FNV-style mix; overflow wraps
+        hashes = (hashes * np.uint64(0x100000001B3)) ^ bands[:, :, r]
+    return hashes
+
+
+def identity_keys(email, phone):
+    """
+    Normalized contact keys: lowercased email and digit-only phone.
+    """
+    keys = []
+    email = email.strip().lower() if isinstance(email, str) else ""
+    if email:
+        keys.append("email:" + email)
+    digits = re.sub(r"\D", "", phone) if isinstance(phone, str) else ""
+    # Too short to identify anyone
+    if len(digits) >= 7:
+        keys.append("phone:" + digits)
+    return keys
+
+
+class _UnionFind:
+    def __init__(self, n=0):
+        self.parent = list(range(n))
+
+    def add(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri == rj:
+            return ri
+        # Lower index is the root, so roots follow input order
+        if rj < ri:
+            ri, rj = rj, ri
+        self.parent[rj] = ri
+        return ri
+
+
+def find_clusters(emails, phones, signatures, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Group rows that share a normalized email or phone, or whose text
+    signatures (see text_signature; "" for none) are at least `threshold`
+    similar. Near-duplicate candidates come from LSH buckets, and each bucket
+    member is compared with at most BUCKET_REPRESENTATIVES of them, so the
+    cost grows with the number of rows, not pairs. Returns the cluster root
+    (the lowest row index in the cluster) of every row.
+    """
+    n = len(emails)
+    sets = _UnionFind(n)
+
+    first_with_key = {}
+    for i, (email, phone) in enumerate(zip(emails, phones)):
+        for key in identity_keys(email, phone):
+            sets.union(i, first_with_key.setdefault(key, i))
+
+    decoded = [decode_signature(s) for s in signatures] if threshold else []
+    rows = np.array([i for i, s in enumerate(decoded) if s is not None], dtype=np.int64)
+    if rows.size > 1:
+        matrix = np.stack([decoded[i] for i in rows])
+        # Identical signatures are joined up front; LSH sees one copy of each
+        matrix, first, inverse = np.unique(matrix, axis=0, return_index=True, return_inverse=True)
+        for i, u in zip(rows.tolist(), rows[first][inverse.ravel()].tolist()):
+            sets.union(i, u)
+        rows = rows[first]
+        hashes = band_hashes(matrix)
+        for band in range(BANDS):
+            order = np.argsort(hashes[:, band], kind="stable")
+            column = hashes[order, band]
+            # Runs of equal band hashes are the LSH buckets
+            starts = np.flatnonzero(np.r_[True, column[1:] != column[:-1]])
+            ends = np.r_[starts[1:], len(column)]
+            for start, end in zip(starts, ends):
+                if end - start < 2:
+                    continue
+                members = order[start:end]
+                # Each pass takes the first unmatched member as a representative,
+                # joins everything similar to it and leaves the rest for the next
+                for _ in range(BUCKET_REPRESENTATIVES):
+                    head, rest = members[0], members[1:]
+                    sims = np.count_nonzero(matrix[rest] == matrix[head], axis=1) / NUM_PERM
+                    matched = sims >= threshold
+                    for m in rest[matched]:
+                        sets.union(int(rows[m]), int(rows[head]))
+                    members = rest[~matched]
+                    if members.size < 2:
+                        break
+
+    return np.array([sets.find(i) for i in range(n)], dtype=np.int64)
+
+
+def duplicate_reason(keeper, row, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Why `row` was grouped with the cluster's `keeper`; both are dicts with
+    email, phone and text_signature.
+    """
+    keeper_keys = identity_keys(keeper.get("email"), keeper.get("phone"))
+    row_keys = identity_keys(row.get("email"), row.get("phone"))
+    shared = set(keeper_keys) & set(row_keys)
+    if any(key.startswith("email:") for key in shared):
+        return "Duplicate Email"
+    if shared:
+        return "Duplicate Phone"
+    a = decode_signature(keeper.get("text_signature"))
+    b = decode_signature(row.get("text_signature"))
+    if threshold and a is not None and b is not None and similarity(a, b) >= threshold:
+        return "Near-Duplicate Resume"
+    return "Duplicate Candidate"
+
+
+class DuplicateIndex:
+    """
+    find_clusters for rows that arrive one at a time. LSH buckets are kept in
+    a dict, which suits the Streamlit app's batch sizes; whole-run detection
+    goes through find_clusters.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.sets = _UnionFind()
+        self.members = {}
+        self._signatures = []
+        self._first_with_key = {}
+        self._buckets = {}
+
+    def add(self, email, phone, signature):
+        """
+        Index a row and return its cluster root; members[root] lists the
+        cluster's row indexes.
+        """
+        i = self.sets.add()
+        self.members[i] = [i]
+        for key in identity_keys(email, phone):
+            self._union(i, self._first_with_key.setdefault(key, i))
+
+        decoded = decode_signature(signature) if self.threshold else None
+        self._signatures.append(decoded)
+        if decoded is not None:
+            for band, value in enumerate(band_hashes(decoded[None, :])[0]):
+                # A bucket keeps the rows that matched none before them, up to
+                # BUCKET_REPRESENTATIVES; rows that joined one are reached through it
+                bucket = self._buckets.setdefault((band, int(value)), [])
+                matched = False
+                for j in bucket:
+                    if self.sets.find(i) == self.sets.find(j):
+                        matched = True
+                    elif similarity(decoded, self._signatures[j]) >= self.threshold:
+                        self._union(i, j)
+                        matched = True
+                if not matched and len(bucket) < BUCKET_REPRESENTATIVES:
+                    bucket.append(i)
+        return self.sets.find(i)
+
+    def _union(self, i, j):
+        ri, rj = self.sets.find(i), self.sets.find(j)
+        if ri == rj:
+            return
+        root = self.sets.union(ri, rj)
+        other = rj if root == ri else ri
+        self.members[root].extend(self.members.pop(other))
@@ -0,0 +1,274 @@
+"""
+Text extractor registry.
+
+Backends are registered per file extension under a name and accept either a
+path or a binary file-like object. extract() tries an
+ordered chain of backends and falls through to the next one when a backend is
+not installed, raises, or returns no text (e.g. a scanned PDF without a text
+layer). Run the benchmark to pick a chain for your documents:
+
+    python -m src.extractors bench ./resumes [--reference pdfminer]
+"""
+import os
+import sys
+import time
+import argparse
+import importlib
+from collections import Counter
+
+# ext -> {name: (function, required module)}
+EXTRACTORS = {}
+
+DEFAULT_CHAINS = {
+    ".pdf": ["pdfminer"],
+    ".docx": ["python-docx"],
+    ".txt": ["text"],
+}
+
+
+def register(ext, name, requires=None):
+    """
+    Decorator registering fn(source, max_pages=0) -> str as a backend for ext,
+    where source is a path or a binary file-like object.
+    """
+    def decorator(fn):
+        EXTRACTORS.setdefault(ext, {})[name] = (fn, requires)
+        return fn
+    return decorator
+
+
+def is_available(ext, name):
+    if name not in EXTRACTORS.get(ext, {}):
+        return False
+    requires = EXTRACTORS[ext][name][1]
+    if requires is None:
+        return True
+    try:
+        importlib.import_module(requires)
+        return True
+    except ImportError:
+        return False
+
+
+def available_backends(ext):
+    return [name for name in EXTRACTORS.get(ext, {}) if is_available(ext, name)]
+
+
+def get_chain(ext, settings=None):
+    """
+    The backend chain for ext: the "<ext>_backends" list from the extraction
+    section of config.yaml (e.g. pdf_backends), else the default.
+    """
+    configured = (settings or {}).get(f"{ext.lstrip('.')}_backends")
+    if configured:
+        return list(configured)
+    return list(DEFAULT_CHAINS.get(ext, []))
+
+
+def extract(source, chain=None, max_pages=0, ext=None):
+    """
+    Extract text using the first backend in chain that yields non-empty text.
+    source is a path, or a binary file-like object together with ext.
+    Returns "" if every backend ran but found no text; raises the last error
+    if none could run.
+    """
+    if ext is None:
+        ext = os.path.splitext(source)[1]
+    ext = ext.lower()
+    chain = chain or get_chain(ext)
+    last_error = None
+    ran = False
+    for name in chain:
+        if not is_available(ext, name):
+            continue
+        fn = EXTRACTORS[ext][name][0]
+        if hasattr(source, "seek"):
+            # A previous backend may have consumed the stream
+            source.seek(0)
+        try:
+            text = fn(source, max_pages=max_pages)
+        except Exception as e:
+            last_error = e
+            continue
+        ran = True
+        if text and text.strip():
+            return text
+    if not ran and last_error is not None:
+        raise last_error
+    if not ran:
+        raise ValueError(f"No available extractor for {ext} (tried: {', '.join(chain)})")
+    return ""
+
+
+############
+## Backends
+############
+
+@register(".pdf", "pdfminer", requires="pdfminer")
+def pdfminer_text(source, max_pages=0):
+    import pdfminer.high_level
+    return pdfminer.high_level.extract_text(source, maxpages=max_pages or 0)
+
+
+@register(".pdf", "pdfminer-layout", requires="pdfminer")
+def pdfminer_layout_text(source, max_pages=0):
+    # The looser margins readpdf.py has always used; joins more words per line
+    import pdfminer.high_level
+    from pdfminer.layout import LAParams
+    laparams = LAParams(char_margin=1.0, word_margin=1.0)
+    return pdfminer.high_level.extract_text(source, laparams=laparams, maxpages=max_pages or 0)
+
+
+@register(".pdf", "pypdf", requires="pypdf")
+def pypdf_text(source, max_pages=0):
+    from pypdf import PdfReader
+    reader = PdfReader(source)
+    pages = reader.pages[:max_pages] if max_pages else reader.pages
+    # Form feed after each page, like pdfminer
+    return "".join((page.extract_text() or "") + "\f" for page in pages)
+
+
+@register(".pdf", "pymupdf", requires="pymupdf")
+def pymupdf_text(source, max_pages=0):
+    import pymupdf
+    if hasattr(source, "read"):
+        doc = pymupdf.open(stream=source.read(), filetype="pdf")
+    else:
+        doc = pymupdf.open(source)
+    with doc:
+        count = min(max_pages, doc.page_count) if max_pages else doc.page_count
+        return "".join(doc.load_page(i).get_text() + "\f" for i in range(count))
+
+
+@register(".docx", "python-docx", requires="docx")
+def docx_text(source, max_pages=0):
+    import docx
+    doc = docx.Document(source)
+    return "\n".join([para.text for para in doc.paragraphs])
+
+
+@register(".txt", "text")
+def plain_text(source, max_pages=0):
+    if hasattr(source, "read"):
+        return source.read().decode("utf-8", errors="ignore")
+    with open(source, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+############
+## Benchmark
+############
+
+def _page_count(file_path):
+    if not file_path.lower().endswith(".pdf"):
+        return 1
+    try:
+        from pdfminer.pdfpage import PDFPage
+        with open(file_path, "rb") as f:
+            return sum(1 for _ in PDFPage.get_pages(f))
+    except Exception:
+        return 0
+
+
+def _tokens(text):
+    from .matcher import tokenize
+    return Counter(tokenize(text or ""))
+
+
+def token_f1(text, reference):
+    """
+    Multiset token F1 between text and reference, in [0, 1].
+    """
+    got, want = _tokens(text), _tokens(reference)
+    if not got and not want:
+        return 1.0
+    overlap = sum((got & want).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(got.values())
+    recall = overlap / sum(want.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def benchmark(corpus_dir, ext=".pdf", backends=None, reference=None):
+    """
+    Time every available backend for ext on every file in corpus_dir.
+    Fidelity is token F1 against a ground-truth '<name>.gt.txt' sidecar when
+    present, else against the reference backend's output.
+    """
+    files = sorted(
+        os.path.join(corpus_dir, f) for f in os.listdir(corpus_dir)
+        if os.path.splitext(f)[1].lower() == ext
+    )
+    backends = backends or available_backends(ext)
+    reference = reference or (backends[0] if backends else None)
+    pages = {f: _page_count(f) for f in files}
+
+    outputs = {}
+    report = {}
+    for name in backends:
+        fn = EXTRACTORS[ext][name][0]
+        elapsed = 0.0
+        failures = 0
+        outputs[name] = {}
+        for f in files:
+            started = time.perf_counter()
+            try:
+                outputs[name][f] = fn(f)
+            except Exception:
+                outputs[name][f] = None
+                failures += 1
+            elapsed += time.perf_counter() - started
+        report[name] = {
+            "documents": len(files),
+            "pages": sum(pages.values()),
+            "seconds": round(elapsed, 3),
+            "pages_per_sec": round(sum(pages.values()) / elapsed, 1) if elapsed else 0.0,
+            "failures": failures,
+            "empty": sum(1 for t in outputs[name].values() if t is not None and not t.strip()),
+        }
+
+    for name in backends:
+        scores = []
+        for f in files:
+            sidecar = os.path.splitext(f)[0] + ".gt.txt"
+            if os.path.exists(sidecar):
+                with open(sidecar, "r", encoding="utf-8", errors="ignore") as fh:
+                    truth = fh.read()
+            else:
+                truth = outputs.get(reference, {}).get(f)
+            if truth is None:
+                continue
+            scores.append(token_f1(outputs[name][f], truth))
+        report[name]["fidelity"] = round(sum(scores) / len(scores), 3) if scores else None
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extractor registry tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Benchmark backends on a local corpus")
+    bench.add_argument("corpus", help="Directory of documents")
+    bench.add_argument("--ext", default=".pdf", help="File type to benchmark (default: .pdf)")
+    bench.add_argument("--backends", nargs="+", help="Backends to compare (default: all installed)")
+    bench.add_argument("--reference", help="Backend whose output is treated as ground truth when no .gt.txt exists")
+    sub.add_parser("list", help="List registered backends")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for ext, backends in EXTRACTORS.items():
+            for name in backends:
+                state = "installed" if is_available(ext, name) else "not installed"
+                print(f"{ext}\t{name}\t{state}")
+        return
+
+    report = benchmark(args.corpus, args.ext, args.backends, args.reference)
+    print(f"{'backend':<18}{'pages/sec':>10}{'seconds':>10}{'fidelity':>10}{'failures':>10}{'empty':>8}")
+    for name, row in sorted(report.items(), key=lambda item: -item[1]["pages_per_sec"]):
+        fidelity = "n/a" if row["fidelity"] is None else f"{row['fidelity']:.3f}"
+        print(f"{name:<18}{row['pages_per_sec']:>10.1f}{row['seconds']:>10.2f}{fidelity:>10}{row['failures']:>10}{row['empty']:>8}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+import csv
+import heapq
+
+LEDGER_COLUMNS = [
+    "filename", "status", "bytes", "pages", "text_chars", "cache_hit", "needs_ocr",
+    "extract_seconds", "extract_cpu_seconds", "parse_seconds", "score_seconds", "total_seconds",
+    "llm_cached", "llm_prompt_tokens", "llm_completion_tokens", "llm_seconds", "llm_retries",
+]
+
+
+class CostLedger:
+    """
+    Per-document cost ledger, streamed to a CSV sidecar as documents finish.
+
+    Only each document's total time is kept in memory, to report how much of
+    the run the most expensive documents account for.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=LEDGER_COLUMNS, extrasaction="ignore")
+        self._writer.writeheader()
+        self._totals = []
+
+    def add(self, data, cost, spans):
+        """
+        Record one processed document from its result row, "_cost" and "_spans".
+        """
+        row = {"filename": data.get("filename"), "status": data.get("status")}
+        row.update(cost or {})
+        for name, seconds, _ in spans or []:
+            row[f"{name}_seconds"] = row.get(f"{name}_seconds", 0.0) + seconds
+        row["total_seconds"] = sum(seconds for _, seconds, _ in spans or [])
+        for column in LEDGER_COLUMNS:
+            if isinstance(row.get(column), float):
+                row[column] = round(row[column], 4)
+        self._writer.writerow(row)
+        self._totals.append((row["total_seconds"], row["filename"]))
+
+    def close(self):
+        self._file.close()
+
+    def print_summary(self, top=5):
+        if not self._totals:
+            return
+        total = sum(seconds for seconds, _ in self._totals) or 1e-9
+        count = max(1, len(self._totals) // 100)
+        heaviest = heapq.nlargest(max(top, count), self._totals)
+        share = sum(seconds for seconds, _ in heaviest[:count]) / total * 100
+        print(f"Cost ledger: {self.path}")
+        print(f"  Top 1% of documents ({count}) took {share:.1f}% of per-document time")
+        for seconds, filename in heaviest[:top]:
+            print(f"  {seconds:8.2f}s  {filename}")
@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import sqlite3
+
+from .cache import hash_file
+from .utils import json_default
+
+
+class Manifest:
+    """
+    Persistent record of processed files, used to resume interrupted runs and
+    skip unchanged resumes.
+
+    Each file is keyed by absolute path and stored with its size, mtime, content
+    hash and result. `context` fingerprints whatever else the result depends on
+    (JD text, scoring settings); entries recorded under a different context are
+    treated as stale. Every record() commits immediately, so a killed run
+    loses at most the document in progress.
+    """
+
+    def __init__(self, path, context=""):
+        self.path = path
+        self.context = context
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT,"
+            " context TEXT, result TEXT, updated REAL)"
+        )
+
+    def lookup(self, file_path):
+        """
+        Return the stored result if file_path was already processed in this
+        context and has not changed since, else None.
+        """
+        key = os.path.abspath(file_path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, sha256, context, result FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        size, mtime_ns, sha256, context, result = row
+        if context != self.context:
+            return None
+
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if stat.st_size != size:
+            return None
+        if stat.st_mtime_ns != mtime_ns:
+            # Touched (copied, re-synced) but possibly unchanged: fall back to the hash
+            if hash_file(file_path) != sha256:
+                return None
+            self.conn.execute("UPDATE files SET mtime_ns = ? WHERE path = ?", (stat.st_mtime_ns, key))
+        return json.loads(result)
+
+    def record(self, file_path, result, sha256=None):
+        """
+        Store file_path's result. Pass `sha256` if the file was already
+        hashed (the parser's "_cost"), so it is not read again.
+        """
+        stat = os.stat(file_path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, context, result, updated)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                os.path.abspath(file_path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                sha256 or hash_file(file_path),
+                self.context,
+                json.dumps(result, default=json_default),
+                time.time(),
+            ),
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,99 @@
+import numpy as np
+from scipy import sparse
+
+from .matcher import KeywordMatcher, normalize_keyword
+
+
+class JDMatrixScorer:
+    """
+    Keyword-score N resumes against M job descriptions at once.
+
+    Every JD is compiled with the same KeywordMatcher rules BasicScorer uses,
+    and the union of their keywords forms the term vocabulary. Each resume is
+    scanned once into a sparse binary term vector; the full resumes x JDs score
+    matrix is then a pair of sparse matrix products, giving the same scores as
+    running BasicScorer once per JD.
+    """
+
+    def __init__(self, config, job_descriptions):
+        """
+        job_descriptions: dict of position name -> JD text (insertion order is kept).
+        """
+        scoring_config = config.get("scoring", {})
+        self.red_threshold = scoring_config.get("red_threshold", 40)
+        self.green_threshold = scoring_config.get("green_threshold", 70)
+        bonus_weights = scoring_config.get("bonus_weights", {}) or {}
+
+        self.positions = list(job_descriptions)
+        jd_matchers = [KeywordMatcher(job_descriptions[name], bonus_weights) for name in self.positions]
+
+        self.matcher = KeywordMatcher.from_keywords(k for m in jd_matchers for k in m.keywords)
+        self.vocabulary = self.matcher.keywords
+        self._columns = {k: i for i, k in enumerate(self.vocabulary)}
+
+        # JD x term binary matrix
+        rows, cols = [], []
+        for j, m in enumerate(jd_matchers):
+            for keyword in m.keywords:
+                rows.append(j)
+                cols.append(self._columns[keyword])
+        shape = (len(self.positions), len(self.vocabulary))
+        self.jd_terms = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+        self.jd_sizes = np.asarray(self.jd_terms.sum(axis=1)).ravel()
+
+        # Per-term bonus, mirroring BasicScorer's 10 * (weight - 1) per matched skill
+        bonus = np.zeros(len(self.vocabulary))
+        for skill, weight in bonus_weights.items():
+            col = self._columns.get(normalize_keyword(skill))
+            if col is not None:
+                bonus[col] += 10 * (weight - 1.0)
+        self.jd_bonus = self.jd_terms.multiply(bonus).tocsr()
+
+        self._term_rows = []
+
+    def add_resume(self, resume_text):
+        """
+        Scan one resume into the term matrix. Returns its row index.
+        The text itself is not kept.
+        """
+        found = self.matcher.find(resume_text or "")
+        self._term_rows.append(sorted(self._columns[k] for k in found))
+        return len(self._term_rows) - 1
+
+    def resume_terms(self):
+        indptr = np.zeros(len(self._term_rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(r) for r in self._term_rows])
+        indices = np.fromiter((c for r in self._term_rows for c in r), dtype=np.int64, count=indptr[-1])
+        data = np.ones(len(indices))
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(self._term_rows), len(self.vocabulary)))
+
+    def score(self):
+        """
+        Return (scores, match_pct) as dense (n_resumes x n_positions) arrays.
+        """
+        resumes = self.resume_terms()
+        hits = (resumes @ self.jd_terms.T).toarray()
+        bonus = (resumes @ self.jd_bonus.T).toarray()
+
+        sizes = np.where(self.jd_sizes > 0, self.jd_sizes, 1)
+        match_pct = hits / sizes * 100
+        scores = np.clip(match_pct + bonus, 0, 100)
+        # A JD without keywords scores 0 for everyone, as in BasicScorer
+        scores[:, self.jd_sizes == 0] = 0
+        match_pct[:, self.jd_sizes == 0] = 0
+        return scores, match_pct
+
+    def status_for(self, score):
+        if score < self.red_threshold:
+            return "Red"
+        elif score < self.green_threshold:
+            return "Yellow"
+        return "Green"
+
+    def matched_keywords(self, position_index, limit=10):
+        """
+        Matched keywords per resume for one position, as comma separated strings.
+        """
+        start, end = self.jd_terms.indptr[position_index], self.jd_terms.indptr[position_index + 1]
+        jd_cols = set(self.jd_terms.indices[start:end].tolist())
+        return [", ".join([self.vocabulary[c] for c in row if c in jd_cols][:limit]) for row in self._term_rows]
@@ -1,24 +1,204 @@
+import io
 import os
 import re
-import pdfminer.high_level
-import docx
+import sys
+import time
+import threading
+import tracemalloc
+import multiprocessing
+import pdfminer
 
-def extract_text(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
-    text = ""
+try:
+    import resource
+except ImportError:
+    # Windows: CPU time of the watchdog child is not counted
+    resource = None
+
+from . import extractors
+from .cache import hash_buffer, hash_file
+from .dedup import text_signature
+from .sections import segment
+from .tracing import active_profile, add_child_profile, profiled
+
+# Bump when extraction output changes so cached text from older code is not reused
+EXTRACTOR_VERSION = f"1:pdfminer-{getattr(pdfminer, '__version__', 'unknown')}"
+
+class ExtractionLimitError(Exception):
+    """
+    A document exceeded a configured extraction budget (size or time).
+    """
+
+class ExtractionTimeout(ExtractionLimitError):
+    pass
+
+class DocumentTooLarge(ExtractionLimitError):
+    pass
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+def _as_stream(source):
+    # bytes are shared by BytesIO until written to; a memoryview is copied once
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+def source_name(source, name=None):
+    """
+    The filename of a path, or of an in-memory document given `name` or
+    carrying a .name attribute (Streamlit's UploadedFile does).
+    """
+    if name:
+        return os.path.basename(name)
+    if _is_path(source):
+        return os.path.basename(os.fspath(source))
+    return os.path.basename(getattr(source, "name", "") or "")
+
+def source_size(source):
+    """
+    Size in bytes of a path, bytes-like object or seekable file-like object.
+    """
+    if _is_path(source):
+        return os.path.getsize(source)
+    if isinstance(source, memoryview):
+        return source.nbytes
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if hasattr(source, "getbuffer"):
+        with source.getbuffer() as view:
+            return view.nbytes
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return size
+
+def _read_text(source, max_pages=0, chain=None, ext=None):
+    ext = ext or os.path.splitext(source)[1].lower()
+    if ext not in extractors.EXTRACTORS:
+        return ""
+    # max_pages=0 means all pages
+    return extractors.extract(source, chain=chain, max_pages=max_pages, ext=ext)
+
+def _watchdog_loop(conn):
+    # Runs in the watchdog child: extract documents until the pipe closes.
+    # Forked inside a profiled() block it inherits the parent's profiler and
+    # tracemalloc; it only profiles the documents sent with a profile request.
+    sys.setprofile(None)
+    tracemalloc.stop()
+    while True:
+        try:
+            source, max_pages, chain, ext, profile = conn.recv()
+        except EOFError:
+            return
+        started = time.process_time()
+        info = None
+        try:
+            if profile:
+                with profiled(*profile) as info:
+                    text = _read_text(source, max_pages, chain, ext)
+            else:
+                text = _read_text(source, max_pages, chain, ext)
+            result = ("ok", text)
+        except Exception as e:
+            result = ("error", str(e))
+        conn.send(result + (time.process_time() - started, info))
+
+class _Watchdog:
+    """
+    A long-lived child process that runs this process's extractions, and is
+    killed (then restarted on the next document) if one runs past its
+    deadline. pdfminer cannot be interrupted from outside, so a separate
+    process is the only way to reclaim a worker stuck on a pathological PDF;
+    keeping one child alive avoids a fork per document. In-memory sources
+    are sent to it through the pipe. Inside a profiled() block the child
+    profiles the extraction and its profile is merged into the block's.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.pid = None
+        # CPU seconds the live child reported; a reaped child is counted by RUSAGE_CHILDREN instead
+        self.cpu_seconds = 0.0
+
+    def _start(self):
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_watchdog_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.pid = os.getpid()
+        self.cpu_seconds = 0.0
+
+    def _stop(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process = None
+        self.cpu_seconds = 0.0
+
+    def run(self, source, max_pages, max_seconds, chain=None, ext=None):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Inherited through a fork: the child belongs to the parent process
+                self.process = None
+            if self.process is None or not self.process.is_alive():
+                if self.process is not None:
+                    self._stop()
+                self._start()
+            profile = active_profile()
+            try:
+                self.conn.send((source, max_pages, chain, ext, profile and (profile["dir"], profile["name"])))
+                if not self.conn.poll(max_seconds):
+                    self._stop()
+                    raise ExtractionTimeout(f"Extraction timed out after {max_seconds}s")
+                status, payload, cpu_seconds, child_profile = self.conn.recv()
+            except (EOFError, OSError):
+                self._stop()
+                raise RuntimeError("Extractor process exited without a result")
+            self.cpu_seconds += cpu_seconds
+            add_child_profile(child_profile)
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+_watchdog = _Watchdog()
+
+def _read_text_with_watchdog(source, max_pages, max_seconds, chain=None, ext=None):
+    """
+    Extract in the watchdog process, raising ExtractionTimeout past max_seconds.
+    """
+    return _watchdog.run(source, max_pages, max_seconds, chain, ext)
+
+def extract_text(source, max_pages=0, max_seconds=0, max_bytes=0, chain=None, name=None):
+    """
+    Extract text from a PDF, DOCX or TXT file. Returns None if the file cannot
+    be read. source is a path, or the document itself as bytes, a memoryview
+    or a seekable binary file-like object; for those the format comes from
+    `name` (or the object's .name). Optional budgets: only the first max_pages
+    pages of a PDF are read, files over max_bytes and extractions over
+    max_seconds raise an ExtractionLimitError instead. chain overrides the
+    extractor backends tried, in order (see src/extractors.py).
+    """
+    filename = source_name(source, name)
+    ext = os.path.splitext(filename)[1].lower()
     try:
-        if ext == ".pdf":
-            text = pdfminer.high_level.extract_text(file_path)
-        elif ext == ".docx":
-            doc = docx.Document(file_path)
-            text = "\n".join([para.text for para in doc.paragraphs])
-        elif ext == ".txt":
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
+        if max_bytes and source_size(source) > max_bytes:
+            raise DocumentTooLarge(f"File exceeds {max_bytes // (1024 * 1024)} MB limit")
+        if not _is_path(source):
+            source = _as_stream(source)
+        if max_seconds and ext in (".pdf", ".docx"):
+            return _read_text_with_watchdog(source, max_pages, max_seconds, chain, ext)
+        return _read_text(source, max_pages, chain, ext)
+    except ExtractionLimitError:
+        raise
     except Exception as e:
-        print(f"Error reading file {file_path}: {e}")
+        print(f"Error reading file {filename}: {e}")
         return None
-    return text
 
 def extract_candidate_name(text):
     """
@@ -53,22 +233,100 @@ def extract_candidate_name(text):
     return None
 
 class ResumeParser:
-    def __init__(self):
-        pass
+    def __init__(self, cache=None, limits=None):
+        # Optional src.cache.ExtractionCache
+        self.cache = cache
+        # Per-document budgets, the "extraction" section of config.yaml
+        limits = limits or {}
+        self.max_pages = limits.get("fast_pages", 2) if limits.get("fast") else limits.get("max_pages", 0)
+        self.max_seconds = limits.get("max_seconds", 0)
+        self.max_bytes = limits.get("max_bytes", 0)
+        self.limits = limits
+
+    def _chain(self, filename):
+        ext = os.path.splitext(filename)[1].lower()
+        return extractors.get_chain(ext, self.limits)
+
+    def _extract_uncached(self, source, filename):
+        return extract_text(
+            source, max_pages=self.max_pages, max_seconds=self.max_seconds,
+            max_bytes=self.max_bytes, chain=self._chain(filename), name=filename,
+        )
+
+    def _extract(self, source, filename, cost=None):
+        cost = {} if cost is None else cost
+        cost["cache_hit"] = False
+        if self.cache is None:
+            return self._extract_uncached(source, filename)
+
+        try:
+            # The page budget and backend chain change the output, so they are part of the key
+            variant = f"pages={self.max_pages or 'all'};backends={','.join(self._chain(filename))}"
+            digest = hash_file(source) if _is_path(source) else hash_buffer(source)
+            key = self.cache.key_for(filename, variant=variant, digest=digest)
+            size = source_size(source)
+        except OSError:
+            return self._extract_uncached(source, filename)
+
+        # Passed on so the manifest and candidate store need not read the file again
+        cost["sha256"] = digest
+        text = self.cache.get(key, size)
+        cost["cache_hit"] = text is not None
+        if text is None:
+            text = self._extract_uncached(source, filename)
+            # Failures are not cached so a transient error is retried next run
+            if text is not None:
+                self.cache.put(key, text)
+        return text
+
+    def _cpu_time(self):
+        # This process, reaped children and the live watchdog child, so extraction CPU counts
+        cpu = time.process_time() + _watchdog.cpu_seconds
+        if resource is not None:
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            cpu += children.ru_utime + children.ru_stime
+        return cpu
 
-    def parse_file(self, file_path):
-        filename = os.path.basename(file_path)
-        text = extract_text(file_path)
+    def parse_file(self, source, cost=None, name=None):
+        """
+        Parse one resume from a path, or from bytes, a memoryview or a
+        file-like object named by `name` (see extract_text). If a `cost` dict
+        is given it is filled with what the extraction cost: bytes, pages
+        read, wall/CPU seconds, cache hit, text length and whether a PDF had
+        no text layer (would need OCR).
+        """
+        filename = source_name(source, name)
+        cost = {} if cost is None else cost
+        wall, cpu = time.perf_counter(), self._cpu_time()
+        try:
+            text = self._extract(source, filename, cost)
+            notes = "Failed to extract text (Corrupt/Encrypted)"
+        except ExtractionLimitError as e:
+            text = None
+            notes = str(e)
+        cost["extract_seconds"] = time.perf_counter() - wall
+        cost["extract_cpu_seconds"] = self._cpu_time() - cpu
+        try:
+            cost["bytes"] = source_size(source)
+        except OSError:
+            cost["bytes"] = None
+        is_pdf = filename.lower().endswith(".pdf")
+        # pdfminer ends every page with a form feed
+        cost["pages"] = text.count("\f") if is_pdf and text else None
+        cost["text_chars"] = len(text) if text else 0
+        cost["needs_ocr"] = bool(is_pdf and text is not None and not text.strip())
         
         if text is None:
             return {
                 "filename": filename,
                 "error": True,
-                "notes": "Failed to extract text (Corrupt/Encrypted)",
+                "notes": notes,
                 "candidate_name": "Unknown",
                 "email": "",
                 "phone": "",
-                "raw_text": ""
+                "raw_text": "",
+                "text_signature": "",
+                "sections": []
             }
 
         # simple regex extraction
@@ -84,6 +342,10 @@ class ResumeParser:
         return {
             "filename": filename,
             "raw_text": text,
+            # MinHash of the text for near-duplicate detection; survives dropping raw_text
+            "text_signature": text_signature(text),
+            # [name, start, end] offsets into raw_text (see src/sections.py)
+            "sections": segment(text),
             "email": emails[0] if emails else "",
             "phone": phones[0] if phones else "",
             "candidate_name": candidate_name,
@@ -0,0 +1,418 @@
+import os
+import heapq
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from .cache import ExtractionCache
+from .parser import ResumeParser, EXTRACTOR_VERSION
+from .scorer import ResumeScorer
+from .email_gen import EmailGenerator
+from .tracing import doc_span, should_profile, profiled
+
+# Per-process state, populated once by _init_worker so parser/scorer objects are
+# not pickled for every document.
+_worker = {}
+
+# Documents submitted ahead of the consumer, per worker. Bounds memory when the
+# consumer (LLM scoring, the Excel sink) is slower than parsing.
+PREFETCH_PER_WORKER = 4
+
+
+def apply_score(data, scored):
+    """
+    Fill the scoring columns of a parsed result from a (score, notes, status, matches) tuple.
+    Parse errors get an Error status regardless.
+    """
+    if not data.get("error"):
+        score, notes, status, matches = scored
+        data["score"] = score
+        data["reasoning"] = notes
+        data["status"] = status
+        data["matched_keywords"] = matches
+    else:
+        data["score"] = 0
+        data["reasoning"] = data.get("notes", "Error")
+        data["status"] = "Error"
+        data["matched_keywords"] = ""
+    return data
+
+
+def process_resume(file_path, jd_text, resume_parser, scorer, email_gen, keep_text=True, spans=None, cost=None, name=None):
+    """
+    Parse, score and draft an email for a single resume.
+    With keep_text=False the raw text is dropped once scoring is done.
+    Stage timings are appended to `spans` and extraction costs recorded in
+    `cost` if given (see src/tracing.py and ResumeParser.parse_file).
+    file_path may also be the document's bytes, named by `name`.
+    """
+    with doc_span(spans, "parse"):
+        data = resume_parser.parse_file(file_path, cost, name=name)
+
+    # Score (only if valid)
+    with doc_span(spans, "score"):
+        scored = None if data.get("error") else scorer.score(data["raw_text"], jd_text, data.get("sections"))
+    apply_score(data, scored)
+
+    # Email
+    with doc_span(spans, "email"):
+        data["email_draft"] = email_gen.generate(data)
+    if not keep_text:
+        data.pop("raw_text", None)
+    return data
+
+
+def error_result(file_path, message, email_gen):
+    """
+    Build the result row for a document that could not be processed at all.
+    """
+    data = {
+        "filename": os.path.basename(file_path),
+        "error": True,
+        "notes": message,
+        "candidate_name": "Unknown",
+        "email": "",
+        "phone": "",
+        "raw_text": "",
+        "text_signature": "",
+        "sections": [],
+        "score": 0,
+        "reasoning": message,
+        "status": "Error",
+        "matched_keywords": "",
+    }
+    data["email_draft"] = email_gen.generate(data)
+    return data
+
+
+def _init_worker(config, api_key, jd_text, keep_text=True):
+    _worker["parser"] = ResumeParser(
+        cache=ExtractionCache.from_config(config, EXTRACTOR_VERSION),
+        limits=config.get("extraction", {}),
+    )
+    _worker["scorer"] = ResumeScorer(config, api_key=api_key)
+    _worker["email_gen"] = EmailGenerator(config)
+    _worker["jd_text"] = jd_text
+    _worker["keep_text"] = keep_text
+    # {"rate": ..., "dir": ...} when main.py runs with --profile
+    _worker["profile"] = config.get("profile")
+
+
+def _process_document(file_path, spans, cost, name=None):
+    if _worker["jd_text"] is None:
+        with doc_span(spans, "parse"):
+            return _worker["parser"].parse_file(file_path, cost, name=name)
+    return process_resume(file_path, _worker["jd_text"], _worker["parser"],
+                          _worker["scorer"], _worker["email_gen"], _worker["keep_text"], spans, cost, name)
+
+
+def _process_in_worker(file_path, name=None):
+    # Stage timings ride back on the row as "_spans" and per-document costs as
+    # "_cost"; sampled documents also carry "_profile" (cProfile dump path,
+    # peak traced memory). In-memory documents are passed as bytes plus `name`.
+    spans = []
+    cost = {}
+    profile = _worker.get("profile")
+    name = os.path.basename(name or file_path)
+    try:
+        if profile and should_profile(name, profile.get("rate", 0)):
+            with profiled(profile["dir"], name) as info:
+                data = _process_document(file_path, spans, cost, name)
+            data["_profile"] = info
+        else:
+            data = _process_document(file_path, spans, cost, name)
+    except Exception as e:
+        data = error_result(name, f"Processing failed: {e}", _worker["email_gen"])
+    data["_spans"] = spans
+    data["_cost"] = cost
+    return data
+
+
+def _process_isolated(file_path, initargs, email_gen):
+    """
+    Re-run a single document in its own one-worker pool so a hard crash
+    (segfault, OOM kill) can be pinned on it.
+    """
+    with ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=initargs) as executor:
+        try:
+            return executor.submit(_process_in_worker, file_path).result()
+        except BrokenProcessPool:
+            return error_result(file_path, "Worker process crashed while processing this file", email_gen)
+
+
+def _process_parallel(files, initargs, workers, email_gen):
+    window = workers * PREFETCH_PER_WORKER
+    start = 0
+    while start < len(files):
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs)
+        pending = deque()
+        next_index = start
+        try:
+            while start < len(files):
+                # Top up the window; nothing new is submitted while the consumer is busy
+                while next_index < len(files) and len(pending) < window:
+                    pending.append(executor.submit(_process_in_worker, files[next_index]))
+                    next_index += 1
+                # Futures are consumed in submission order, so output order matches the serial path
+                result = pending[0].result()
+                pending.popleft()
+                start += 1
+                yield result
+        except BrokenProcessPool:
+            # A worker died without raising. Every in-flight future is now broken, so
+            # isolate the document at the head of the queue and restart the pool after it.
+            yield _process_isolated(files[start], initargs, email_gen)
+            start += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+
+def _prefilter(parsed, jd_text, scorer, keep_text):
+    """
+    First stage of the scoring cascade: keyword-score every parsed result and
+    yield (data, shortlisted) pairs in file order; only shortlisted results
+    go on to the LLM. A top_k cut needs the whole run, so with one every row
+    is held until the last document is parsed and only the current top_k
+    keep their text (unless keep_text).
+    """
+    def prescore(data):
+        with doc_span(data.setdefault("_spans", []), "prefilter"):
+            data["_prescore"] = scorer.prefilter.score(data["raw_text"], jd_text)
+        return data["_prescore"][0]
+
+    def drop_text(data):
+        if not keep_text:
+            data.pop("raw_text", None)
+
+    if not scorer.cascade_top_k:
+        for data in parsed:
+            shortlisted = not data.get("error") and prescore(data) >= scorer.cascade_min_score
+            if not shortlisted:
+                drop_text(data)
+            yield data, shortlisted
+        return
+
+    rows = []
+    best = []
+    for i, data in enumerate(parsed):
+        rows.append(data)
+        if data.get("error"):
+            continue
+        score = prescore(data)
+        if score < scorer.cascade_min_score:
+            drop_text(data)
+            continue
+        # Min-heap of the top_k so far; ties go to the earlier document
+        item = (score, -i)
+        if len(best) < scorer.cascade_top_k:
+            heapq.heappush(best, item)
+        elif item > best[0]:
+            drop_text(rows[-heapq.heapreplace(best, item)[1]])
+        else:
+            drop_text(data)
+    shortlisted = {-i for _, i in best}
+    for i, data in enumerate(rows):
+        yield data, i in shortlisted
+
+
+def _score_llm_batches(parsed, jd_text, scorer, email_gen, batch_size, keep_text):
+    """
+    Score parsed results in batches through the scorer's concurrent batch path.
+    With a scoring cascade only the prefilter's shortlist reaches the LLM, and
+    a batch is sent once it holds batch_size of them.
+    """
+    def flush(batch):
+        valid = [data for data, shortlisted in batch if shortlisted]
+        costs = [data.setdefault("_cost", {}) for data in valid]
+        batch_spans = []
+        with doc_span(batch_spans, "score"):
+            scores = scorer.score_llm([data["raw_text"] for data in valid], jd_text, costs, [data.get("sections") for data in valid]) if valid else []
+        # Requests in a batch overlap, so each document gets an equal share of the batch time
+        _, seconds, cpu_seconds = batch_spans[0]
+        scored = iter(scores)
+        for data, shortlisted in batch:
+            spans = data.setdefault("_spans", [])
+            prescore = data.pop("_prescore", None)
+            if shortlisted:
+                spans.append(["score", seconds / len(valid), cpu_seconds / len(valid)])
+                apply_score(data, next(scored))
+            else:
+                apply_score(data, None if data.get("error") else scorer.not_shortlisted(prescore))
+            with doc_span(spans, "email"):
+                data["email_draft"] = email_gen.generate(data)
+            if not keep_text:
+                data.pop("raw_text", None)
+        return [data for data, _ in batch]
+
+    if scorer.cascades:
+        parsed = _prefilter(parsed, jd_text, scorer, keep_text)
+    else:
+        parsed = ((data, not data.get("error")) for data in parsed)
+
+    batch = []
+    sent = 0
+    for data, shortlisted in parsed:
+        batch.append((data, shortlisted))
+        sent += shortlisted
+        # Rows kept from the LLM are cheap to hold, but not without limit
+        if sent >= batch_size or len(batch) >= 8 * batch_size:
+            yield from flush(batch)
+            batch = []
+            sent = 0
+    if batch:
+        yield from flush(batch)
+
+
+def process_files(files, jd_text, config, api_key=None, workers=1, scorer=None, keep_text=True):
+    """
+    Process resumes and yield one result dict per file, in the order of `files`.
+    With workers > 1 parsing and scoring run in a process pool; a document that
+    raises or crashes its worker yields an Error row instead of aborting the batch.
+    With an LLM scorer, files are parsed (in the pool) and then scored in
+    concurrent batches of llm.batch_size from this process; with a scoring
+    cascade (scoring.cascade) only the best keyword matches are sent.
+    If jd_text is None files are only parsed (see parse_files). Pass `scorer`
+    to reuse (and later inspect) an existing ResumeScorer for the LLM path.
+    With keep_text=False results carry no raw_text, so nothing holds on to
+    document text after scoring. Only a bounded window of documents is in
+    flight at a time, so a slow consumer throttles parsing.
+    Each result carries its stage timings under "_spans", its cost ledger
+    entry under "_cost" (and "_profile" for documents sampled by
+    config["profile"]); pop them before storing the row.
+    """
+    email_gen = EmailGenerator(config)
+
+    if jd_text is not None:
+        scorer = scorer or ResumeScorer(config, api_key=api_key)
+        if scorer.uses_llm:
+            batch_size = config.get("llm", {}).get("batch_size", 64)
+            yield from _score_llm_batches(parse_files(files, config, workers), jd_text, scorer, email_gen, batch_size, keep_text)
+            return
+
+    initargs = (config, api_key, jd_text, keep_text)
+    if workers <= 1:
+        _init_worker(*initargs)
+        for file_path in files:
+            yield _process_in_worker(file_path)
+    else:
+        yield from _process_parallel(files, initargs, workers, email_gen)
+
+
+class ParsePool:
+    """
+    A long-lived pool of parse-only worker processes, for a server that parses
+    uploads run after run (the Streamlit app): workers start once, not per run.
+    It is shared by every job, so no job stops the workers; only a crash
+    replaces them.
+    """
+
+    def __init__(self, config, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.generation = 0
+        self._initargs = (config, None, None, True)
+        self._lock = threading.Lock()
+        self._executor = self._start()
+
+    def _start(self):
+        # The caller is usually a threaded server (Streamlit), which is not safe to fork
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                   initializer=_init_worker, initargs=self._initargs)
+
+    def submit(self, name, data):
+        """
+        Parse one in-memory document. Returns the future and the pool
+        generation it was submitted to.
+        """
+        with self._lock:
+            return self._executor.submit(_process_in_worker, data, name), self.generation
+
+    def restart(self, generation):
+        """
+        Replace pool `generation` after one of its workers crashed, which
+        broke it; every job's unfinished futures on it fail with BrokenProcessPool.
+        """
+        with self._lock:
+            if generation != self.generation:
+                # Already replaced
+                return
+            self._executor.shutdown(wait=False)
+            self.generation += 1
+            self._executor = self._start()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BackgroundJob:
+    """
+    Parse in-memory documents, (name, bytes) pairs, on a ParsePool without
+    blocking the caller. poll() returns (position, result) pairs as documents
+    complete, in completion order; cancel() drops every document not yet
+    started. The few already in flight finish in the background and are
+    ignored, since the workers are shared with other jobs.
+    """
+
+    # Documents that were in flight when a worker crashed are retried this many
+    # times in a fresh pool before they are recorded as errors
+    MAX_RETRIES = 1
+
+    def __init__(self, documents, pool, email_gen):
+        self.total = len(documents)
+        self.completed = 0
+        self.cancelled = False
+        self._pool = pool
+        self._email_gen = email_gen
+        self._pending = {}
+        for i, (name, data) in enumerate(documents):
+            self._submit(i, name, data, 0)
+
+    def _submit(self, i, name, data, attempt):
+        future, generation = self._pool.submit(name, data)
+        self._pending[future] = (i, name, data, attempt, generation)
+
+    @property
+    def done(self):
+        return self.cancelled or not self._pending
+
+    def poll(self, timeout=0):
+        """
+        Results completed since the last call, waiting up to `timeout`
+        seconds for at least one.
+        """
+        if self.done:
+            return []
+        finished, _ = wait(list(self._pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        results = []
+        for future in finished:
+            i, name, data, attempt, generation = self._pending.pop(future)
+            try:
+                results.append((i, future.result()))
+            except BrokenProcessPool:
+                # A crash breaks every in-flight future, also those of other
+                # jobs on the pool; it is restarted once per crash
+                self._pool.restart(generation)
+                if attempt < self.MAX_RETRIES:
+                    self._submit(i, name, data, attempt + 1)
+                else:
+                    results.append((i, error_result(name, "Worker process crashed while processing this file", self._email_gen)))
+        self.completed += len(results)
+        return results
+
+    def cancel(self):
+        self.cancelled = True
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+
+def parse_files(files, config, workers=1):
+    """
+    Parse resumes without scoring them, yielding ResumeParser results in file order.
+    """
+    return process_files(files, None, config, workers=workers)
@@ -0,0 +1,150 @@
+import json
+import heapq
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from .matcher import tokenize
+
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+INDEX_FORMAT = 1
+
+
+class BM25Index:
+    """
+    Inverted index over a batch of resumes, ranked against a JD with Okapi BM25.
+
+    Unlike BasicScorer, a JD word counts in proportion to how rare it is in the
+    batch (IDF), and repeated mentions count with diminishing returns, so
+    "experience" or "team" no longer outweigh the skills that tell candidates
+    apart. Documents are added with add(); finalize() freezes the postings
+    into term-major arrays and precomputes IDF and length normalization.
+    An index loaded with load() ranks exactly like the one that was saved.
+    """
+
+    def __init__(self, k1=DEFAULT_K1, b=DEFAULT_B):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids = []
+        self.vocabulary = {}
+        self._doc_lengths = array("I")
+        # Postings in arrival order (doc-major) until finalize()
+        self._docs = array("I")
+        self._terms = array("I")
+        self._tfs = array("I")
+        self._finalized = False
+
+    @classmethod
+    def from_config(cls, config):
+        ranking = config.get("ranking", {})
+        return cls(k1=ranking.get("k1", DEFAULT_K1), b=ranking.get("b", DEFAULT_B))
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, doc_id, text):
+        """
+        Index one document. The text itself is not kept.
+        """
+        if self._finalized:
+            raise RuntimeError("Cannot add documents to a finalized index")
+        doc = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        tokens = tokenize(text or "")
+        self._doc_lengths.append(len(tokens))
+        counts = Counter(tokens)
+        vocabulary = self.vocabulary
+        self._terms.extend([vocabulary.setdefault(term, len(vocabulary)) for term in counts])
+        self._tfs.extend(counts.values())
+        self._docs.extend([doc] * len(counts))
+        return doc
+
+    def finalize(self):
+        """
+        Group postings by term and precompute IDF and per-document length
+        normalization. Called automatically by the query methods.
+        """
+        if self._finalized:
+            return self
+        terms = np.frombuffer(self._terms, dtype=np.uint32)
+        # Stable, so each term's postings stay in document order
+        order = np.argsort(terms, kind="stable")
+        self.postings_docs = np.frombuffer(self._docs, dtype=np.uint32)[order]
+        self.postings_tfs = np.frombuffer(self._tfs, dtype=np.uint32)[order].astype(np.float64)
+        doc_freq = np.bincount(terms, minlength=len(self.vocabulary))
+        self.indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=self.indptr[1:])
+        self.doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32).astype(np.float64)
+        self._precompute(doc_freq)
+        self._docs = self._terms = self._tfs = self._doc_lengths = None
+        self._finalized = True
+        return self
+
+    def _precompute(self, doc_freq):
+        n = len(self.doc_ids)
+        # Lucene's IDF, which stays positive for terms in more than half the docs
+        self.idf = np.log1p((n - doc_freq + 0.5) / (doc_freq + 0.5))
+        avgdl = self.doc_lengths.mean() if n else 0.0
+        self.norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / (avgdl or 1.0))
+
+    def query_terms(self, job_description):
+        """
+        The JD's distinct indexed terms, in JD order.
+        """
+        return [t for t in dict.fromkeys(tokenize(job_description)) if t in self.vocabulary]
+
+    def scores(self, job_description):
+        """
+        BM25 score of every document, as an array in add() order.
+        """
+        self.finalize()
+        scores = np.zeros(len(self.doc_ids))
+        for term in self.query_terms(job_description):
+            t = self.vocabulary[term]
+            start, end = self.indptr[t], self.indptr[t + 1]
+            docs = self.postings_docs[start:end]
+            tfs = self.postings_tfs[start:end]
+            scores[docs] += self.idf[t] * tfs * (self.k1 + 1) / (tfs + self.norm[docs])
+        return scores
+
+    def top_k(self, job_description, k=10):
+        """
+        The k best (doc_id, score) pairs, best first. Documents sharing no
+        term with the JD are never considered, and only a k-sized heap is
+        kept instead of sorting the whole pool. Ties go to the earlier document.
+        """
+        scores = self.scores(job_description)
+        candidates = np.flatnonzero(scores)
+        best = heapq.nlargest(k, candidates.tolist(), key=lambda doc: (scores[doc], -doc))
+        return [(self.doc_ids[doc], float(scores[doc])) for doc in best]
+
+    def save(self, path):
+        """
+        Write the finalized index to a .npz file.
+        """
+        self.finalize()
+        meta = {"format": INDEX_FORMAT, "k1": self.k1, "b": self.b, "doc_ids": self.doc_ids,
+                "terms": sorted(self.vocabulary, key=self.vocabulary.get)}
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f, meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+                postings_docs=self.postings_docs, postings_tfs=self.postings_tfs,
+                indptr=self.indptr, doc_lengths=self.doc_lengths, idf=self.idf, norm=self.norm,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            if meta.get("format") != INDEX_FORMAT:
+                raise ValueError(f"Unsupported index format in {path}")
+            index = cls(k1=meta["k1"], b=meta["b"])
+            index.doc_ids = meta["doc_ids"]
+            index.vocabulary = {term: i for i, term in enumerate(meta["terms"])}
+            for name in ("postings_docs", "postings_tfs", "indptr", "doc_lengths", "idf", "norm"):
+                setattr(index, name, data[name])
+        index._docs = index._terms = index._tfs = index._doc_lengths = None
+        index._finalized = True
+        return index
@@ -1,7 +1,39 @@
-import re
 import json
-import os
 import time
+import heapq
+import asyncio
+import hashlib
+import weakref
+import threading
+
+from .cache import LLMResponseCache, ModelDiscoveryCache
+from .matcher import KeywordMatcher, normalize_keyword
+from .ratelimit import RateLimiter, backoff_delay
+from .sections import compact_text, excerpt
+
+# Rough size of a token in English text, for budgets and rate limiting
+CHARS_PER_TOKEN = 4
+
+PROMPT_TEMPLATE = """You are an expert technical recruiter.
+Evaluate the following resume against the job description.
+
+Job Description:
+{job_description}
+
+Resume Content:
+{resume}
+
+Output valid JSON with these fields:
+- score (integer 0-100)
+- status (Red, Yellow, Green)
+- reasoning (brief summary of why)
+- matched_keywords (comma separated string of top skills found)
+"""
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN
+
 
 class BasicScorer:
     def __init__(self, config):
@@ -9,38 +41,33 @@ class BasicScorer:
         self.scoring_config = config.get("scoring", {})
         self.red_threshold = self.scoring_config.get("red_threshold", 40)
         self.green_threshold = self.scoring_config.get("green_threshold", 70)
-        self.bonus_weights = self.scoring_config.get("bonus_weights", {})
+        self.bonus_weights = self.scoring_config.get("bonus_weights", {}) or {}
+        self._matcher = None
+
+    def compile(self, job_description):
+        """
+        Return the KeywordMatcher for this JD, reusing it while the JD is unchanged.
+        """
+        if self._matcher is None or self._matcher.job_description != job_description:
+            self._matcher = KeywordMatcher(job_description, self.bonus_weights)
+        return self._matcher
 
     def score(self, resume_text, job_description):
-        # Naive keyword extraction from JD:
-        jd_words = set(re.findall(r'\b\w{4,}\b', job_description.lower()))
+        matcher = self.compile(job_description)
         
-        if not jd_words:
+        if not len(matcher):
             return 0, "No valid keywords in JD", "Red", ""
 
-        resume_lower = resume_text.lower()
-        
-        matched_keywords = []
-        missing_keywords = []
+        matched_keywords, missing_keywords = matcher.match(resume_text)
         
         # Base score: percentage of matched keywords
-        matches = 0
-        for word in jd_words:
-            if word in resume_lower:
-                matches += 1
-                matched_keywords.append(word)
-            else:
-                missing_keywords.append(word)
-                
-        if len(jd_words) == 0:
-            match_percentage = 0
-        else:
-            match_percentage = (matches / len(jd_words)) * 100
+        match_percentage = (len(matched_keywords) / len(matcher)) * 100
         
         # Apply weights
         weighted_score = match_percentage
+        matched_set = set(matched_keywords)
         for skill, weight in self.bonus_weights.items():
-            if skill.lower() in matched_keywords:
+            if normalize_keyword(skill) in matched_set:
                 weighted_score += 10 * (weight - 1.0) 
 
         final_score = min(100, max(0, weighted_score))
@@ -54,7 +81,7 @@ class BasicScorer:
             status = "Green"
             
         # Notes
-        notes = f"Matched {len(matched_keywords)}/{len(jd_words)} keywords ({match_percentage:.1f}%)."
+        notes = f"Matched {len(matched_keywords)}/{len(matcher)} keywords ({match_percentage:.1f}%)."
         if missing_keywords:
             notes += f" Missing: {', '.join(sorted(list(missing_keywords))[:5])}..."
             
@@ -63,6 +90,34 @@ class BasicScorer:
         return final_score, notes, status, matched_str
 
 
+def _status_code(error):
+    """
+    Best-effort HTTP status of a provider exception (openai or google.api_core).
+    """
+    code = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if callable(code):
+        code = code()
+    code = getattr(code, "value", code)
+    return code if isinstance(code, int) else None
+
+
+def _is_retryable(error):
+    code = _status_code(error)
+    if code is not None:
+        return code == 429 or code >= 500
+    # Connection resets and timeouts carry no status
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "ServiceUnavailable", "DeadlineExceeded")
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
 class LLMScorer:
     def __init__(self, config, api_key, provider="openai"):
         self.config = config
@@ -73,24 +128,107 @@ class LLMScorer:
             self.model = "gemini-pro"
         else:
             self.model = self.llm_config.get("model", "gpt-3.5-turbo")
+        self.temperature = self.llm_config.get("temperature", 0)
+        self.base_url = self.llm_config.get("base_url") or None
+        self.max_concurrency = self.llm_config.get("max_concurrency", 8)
+        self.max_retries = self.llm_config.get("max_retries", 5)
+        self.requests_per_minute = self.llm_config.get("requests_per_minute", 0)
+        self.tokens_per_minute = self.llm_config.get("tokens_per_minute", 0)
+        self._openai_client = None
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._loop = None
+        # A scorer shared between threads (the app's cached one) runs one batch at a time
+        self._loop_lock = threading.Lock()
+        self._limiter = None
+        self._gemini_configured = False
+        self._gemini_model_name = None
+        self._gemini_models = {}
+        self._discovery_lock = threading.Lock()
+        self._timing_lock = threading.Lock()
+        self._model_store = ModelDiscoveryCache.from_config(config)
+        self.cache = LLMResponseCache.from_config(config)
+        # Seconds spent in provider calls, split into model discovery and generation
+        self.timings = {"discovery": 0.0, "generation": 0.0, "discoveries": 0}
+        # Prompt token budget, estimated at CHARS_PER_TOKEN
+        self.resume_tokens = self.llm_config.get("resume_tokens", 600)
+        self.jd_tokens = self.llm_config.get("jd_tokens", 400)
+        self.prompt_stats = {"prompts": 0, "tokens": 0, "baseline_tokens": 0}
+
+    def build_prompt(self, resume_text, job_description, sections=None):
+        """
+        The scoring prompt, with the JD and the resume's most relevant
+        sections (see src/sections.py) filling llm.jd_tokens and
+        llm.resume_tokens. sections are the parser's offsets into
+        resume_text; the text is segmented here if they are not given.
+        """
+        # A budget of null sends the whole text
+        jd_chars = None if self.jd_tokens is None else self.jd_tokens * CHARS_PER_TOKEN
+        resume_chars = None if self.resume_tokens is None else self.resume_tokens * CHARS_PER_TOKEN
+        prompt = PROMPT_TEMPLATE.format(
+            job_description=compact_text(job_description, jd_chars),
+            resume=excerpt(resume_text, sections, resume_chars),
+        )
+        # Size of the same prompt with the fixed character cuts used before the budget
+        baseline = len(PROMPT_TEMPLATE) + min(len(job_description), 2000) + min(len(resume_text), 4000)
+        with self._timing_lock:
+            self.prompt_stats["prompts"] += 1
+            self.prompt_stats["tokens"] += estimate_tokens(prompt)
+            self.prompt_stats["baseline_tokens"] += baseline // CHARS_PER_TOKEN
+        return prompt
+
+    def prompt_savings(self):
+        """
+        Average estimated prompt tokens so far, against the fixed-cut prompt.
+        """
+        stats = self.prompt_stats
+        if not stats["prompts"]:
+            return None
+        tokens = stats["tokens"] / stats["prompts"]
+        baseline = stats["baseline_tokens"] / stats["prompts"]
+        return {"tokens": round(tokens), "baseline_tokens": round(baseline),
+                "reduction_pct": round(100 * (1 - tokens / baseline), 1) if baseline else 0.0}
+
+    def parse_response(self, response):
+        # Parse JSON
+        cleaned = response.replace("```json", "").replace("```", "").strip()
+        data = json.loads(cleaned)
         
-    def score(self, resume_text, job_description):
-        prompt = f"""
-        You are an expert technical recruiter. 
-        Evaluate the following resume against the job description.
-        
-        Job Description:
-        {job_description[:2000]}
+        # Extract list or string
+        matched = data.get("matched_keywords", "")
+        if isinstance(matched, list):
+            matched = ", ".join(matched)
         
-        Resume Content:
-        {resume_text[:4000]}
+        return data.get("score", 0), data.get("reasoning", "No reasoning"), data.get("status", "Red"), matched
         
-        Output valid JSON with these fields:
-        - score (integer 0-100)
-        - status (Red, Yellow, Green)
-        - reasoning (brief summary of why)
-        - matched_keywords (comma separated string of top skills found)
-        """
+    def _cache_key(self, prompt, resume_text):
+        if self.cache is None:
+            return None
+        return self.cache.key_for(self.provider, self.model, self.temperature, prompt, resume_text)
+
+    def _cached(self, key):
+        if key is None:
+            return None
+        response = self.cache.get(key)
+        if response is None:
+            return None
+        try:
+            return self.parse_response(response)
+        except Exception:
+            return None
+
+    def _parse_and_store(self, key, response):
+        # Only responses that parse are cached, so errors are retried next run
+        result = self.parse_response(response)
+        if key is not None:
+            self.cache.put(key, response)
+        return result
+
+    def score(self, resume_text, job_description, sections=None):
+        prompt = self.build_prompt(resume_text, job_description, sections)
+        key = self._cache_key(prompt, resume_text)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
         
         try:
             if self.provider == "openai":
@@ -100,37 +238,190 @@ class LLMScorer:
             else:
                 return 0, "Invalid LLM Provider", "Red", ""
                 
-            # Parse JSON
-            cleaned = response.replace("```json", "").replace("```", "").strip()
-            data = json.loads(cleaned)
-            
-            # Extract list or string
-            matched = data.get("matched_keywords", "")
-            if isinstance(matched, list):
-                matched = ", ".join(matched)
-            
-            return data.get("score", 0), data.get("reasoning", "No reasoning"), data.get("status", "Red"), matched
+            return self._parse_and_store(key, response)
             
         except Exception as e:
             return 0, f"LLM Error: {str(e)}", "Red", ""
 
+    def score_batch(self, resume_texts, job_description, costs=None, sections=None):
+        """
+        Score many resumes concurrently. Returns results in input order.
+        Runs its own event loop, so call it from synchronous code.
+        """
+        # One loop for the scorer's lifetime, so the pooled client and the rate
+        # limiter carry over from batch to batch
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(self.score_batch_async(resume_texts, job_description, costs, sections))
+
+    async def score_batch_async(self, resume_texts, job_description, costs=None, sections=None):
+        """
+        Score resumes with at most max_concurrency requests in flight, under the
+        configured requests/min and tokens/min limits, over one pooled client.
+        The limiter and the client are kept for the scorer's lifetime (the
+        client per event loop); close() releases them.
+        If `costs` is a list of dicts (one per resume) each is filled with the
+        request's token usage, latency, retries and whether the cache answered.
+        `sections` optionally holds each resume's section offsets.
+        """
+        if self.provider not in ("openai", "gemini"):
+            return [(0, "Invalid LLM Provider", "Red", "")] * len(resume_texts)
+
+        limiter = self._rate_limiter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self._async_client()
+        costs = costs if costs is not None else [{} for _ in resume_texts]
+        sections = sections if sections is not None else [None] * len(resume_texts)
+
+        async def score_one(resume_text, usage, offsets):
+            prompt = self.build_prompt(resume_text, job_description, offsets)
+            key = self._cache_key(prompt, resume_text)
+            # Cache reads and writes are blocking SQLite calls; keep them off the event loop
+            cached = await asyncio.to_thread(self._cached, key) if key is not None else None
+            usage["llm_cached"] = cached is not None
+            if cached is not None:
+                return cached
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await self._call_with_retry(client, prompt, limiter, usage)
+                    if key is None:
+                        return self.parse_response(response)
+                    return await asyncio.to_thread(self._parse_and_store, key, response)
+                except Exception as e:
+                    return 0, f"LLM Error: {str(e)}", "Red", ""
+                finally:
+                    usage["llm_seconds"] = time.perf_counter() - started
+
+        return await asyncio.gather(*(score_one(text, usage, offsets) for text, usage, offsets in zip(resume_texts, costs, sections)))
+
+    async def _call_with_retry(self, client, prompt, limiter, usage=None):
+        # Rough token estimate plus room for the JSON answer
+        estimated_tokens = estimate_tokens(prompt) + 300
+        usage = {} if usage is None else usage
+        attempt = 0
+        while True:
+            await limiter.acquire(estimated_tokens)
+            usage["llm_retries"] = attempt
+            try:
+                if self.provider == "openai":
+                    return await self._call_openai_async(client, prompt, usage)
+                return await self._call_gemini_async(prompt, usage)
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                delay = _retry_after(e)
+                await asyncio.sleep(delay if delay is not None else backoff_delay(attempt))
+                attempt += 1
+
+    def _rate_limiter(self):
+        if self._limiter is None:
+            self._limiter = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+        return self._limiter
+
+    def _async_client(self):
+        if self.provider == "openai":
+            # An async client is bound to the event loop it first ran on
+            loop = asyncio.get_running_loop()
+            if loop not in self._async_clients:
+                from openai import AsyncOpenAI
+                # Retries are handled by _call_with_retry so they respect the rate limiter
+                self._async_clients[loop] = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+            return self._async_clients[loop]
+        self._configure_gemini()
+        return None
+
+    def close(self):
+        """
+        Close the pooled clients and the batch event loop.
+        """
+        with self._loop_lock:
+            loop = self._loop
+            if loop is not None and loop in self._async_clients:
+                loop.run_until_complete(self._async_clients[loop].close())
+            self._async_clients.clear()
+            if loop is not None:
+                loop.close()
+                self._loop = None
+        if self._openai_client is not None:
+            self._openai_client.close()
+            self._openai_client = None
+
+    def _messages(self, prompt):
+        return [
+            {"role": "system", "content": "You are a helpful assistant that outputs JSON."},
+            {"role": "user", "content": prompt}
+        ]
+
     def _call_openai(self, prompt):
-        from openai import OpenAI
-        client = OpenAI(api_key=self.api_key)
+        if self._openai_client is None:
+            from openai import OpenAI
+            self._openai_client = OpenAI(api_key=self.api_key, base_url=self.base_url)
         
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that outputs JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0
-        )
+        started = time.perf_counter()
+        try:
+            response = self._openai_client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(prompt),
+                temperature=self.temperature
+            )
+        finally:
+            self._add_timing("generation", time.perf_counter() - started)
         return response.choices[0].message.content
 
-    def _call_gemini(self, prompt):
+    async def _call_openai_async(self, client, prompt, usage=None):
+        started = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(prompt),
+                temperature=self.temperature
+            )
+        finally:
+            self._add_timing("generation", time.perf_counter() - started)
+        if usage is not None and getattr(response, "usage", None) is not None:
+            usage["llm_prompt_tokens"] = response.usage.prompt_tokens
+            usage["llm_completion_tokens"] = response.usage.completion_tokens
+        return response.choices[0].message.content
+
+    def _configure_gemini(self):
         import google.generativeai as genai
-        genai.configure(api_key=self.api_key)
+        if not self._gemini_configured:
+            genai.configure(api_key=self.api_key)
+            self._gemini_configured = True
+        return genai
+
+    def _gemini_store_key(self):
+        # Persisted per API key (hashed), since keys can see different model lists
+        return "gemini:" + hashlib.sha256(self.api_key.encode("utf-8")).hexdigest()[:16]
+
+    def _known_gemini_model(self):
+        if self._gemini_model_name is None and self._model_store is not None:
+            self._gemini_model_name = self._model_store.get(self._gemini_store_key())
+        return self._gemini_model_name
+
+    def _remember_gemini_model(self, model_name):
+        self._gemini_model_name = model_name
+        if self._model_store is not None:
+            self._model_store.put(self._gemini_store_key(), model_name)
+
+    def _forget_gemini_model(self, model_name):
+        if self._gemini_model_name == model_name:
+            self._gemini_model_name = None
+        self._gemini_models.pop(model_name, None)
+        if self._model_store is not None:
+            self._model_store.delete(self._gemini_store_key())
+
+    def _gemini_model(self, model_name):
+        if model_name not in self._gemini_models:
+            genai = self._configure_gemini()
+            self._gemini_models[model_name] = genai.GenerativeModel(model_name)
+        return self._gemini_models[model_name]
+
+    def _gemini_candidates(self):
+        genai = self._configure_gemini()
+        started = time.perf_counter()
         
         # 1. Get all valid models
         valid_models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
@@ -144,28 +435,79 @@ class LLMScorer:
             if 'pro' in n: return 3
             return 4 
             
-        sorted_models = sorted(valid_models, key=model_priority)
-        
-        last_error = None
-        
-        # 3. Try them in order until one works
-        for model_name in sorted_models:
+        self._add_timing("discovery", time.perf_counter() - started)
+        self.timings["discoveries"] += 1
+        return sorted(valid_models, key=model_priority)
+
+    def _generate_gemini(self, model_name, prompt):
+        started = time.perf_counter()
+        try:
+            return self._gemini_model(model_name).generate_content(prompt).text
+        finally:
+            self._add_timing("generation", time.perf_counter() - started)
+
+    def _call_gemini(self, prompt):
+        # Fast path: reuse the model that last worked (in memory or persisted)
+        model_name = self._known_gemini_model()
+        if model_name:
             try:
-                # print(f"Trying model: {model_name}...") 
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-                
-                # If we get here, it worked! Save this model for next time to save time
-                self._gemini_model_name = model_name
-                return response.text
-                
+                return self._generate_gemini(model_name, prompt)
             except Exception as e:
-                # print(f"Failed with {model_name}: {e}")
-                last_error = e
-                continue
+                # Transient errors keep the model; anything else triggers rediscovery
+                if _is_retryable(e):
+                    raise
+                self._forget_gemini_model(model_name)
+        
+        # Slow path: one discovery at a time; concurrent callers reuse its result
+        with self._discovery_lock:
+            known = self._gemini_model_name
+            if known and known != model_name:
+                return self._generate_gemini(known, prompt)
+            
+            sorted_models = self._gemini_candidates()
+            last_error = None
+            
+            # 3. Try them in order until one works
+            for candidate in sorted_models:
+                try:
+                    response = self._generate_gemini(candidate, prompt)
+                    
+                    # If we get here, it worked! Save this model for next time to save time
+                    self._remember_gemini_model(candidate)
+                    return response
+                    
+                except Exception as e:
+                    last_error = e
+                    continue
                 
         raise last_error if last_error else ValueError("No working Gemini models found.")
 
+    async def _call_gemini_async(self, prompt, usage=None):
+        model_name = self._known_gemini_model()
+        if model_name:
+            started = time.perf_counter()
+            try:
+                response = await self._gemini_model(model_name).generate_content_async(prompt)
+                metadata = getattr(response, "usage_metadata", None)
+                if usage is not None and metadata is not None:
+                    usage["llm_prompt_tokens"] = metadata.prompt_token_count
+                    usage["llm_completion_tokens"] = metadata.candidates_token_count
+                return response.text
+            except Exception as e:
+                if _is_retryable(e):
+                    raise
+                self._forget_gemini_model(model_name)
+            finally:
+                self._add_timing("generation", time.perf_counter() - started)
+        
+        # No working model known: run the discovery/fallback path off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._call_gemini, prompt)
+
+    def _add_timing(self, name, seconds):
+        with self._timing_lock:
+            self.timings[name] += seconds
+
 class ResumeScorer:
     def __init__(self, config, api_key=None):
         self.config = config
@@ -186,5 +528,120 @@ class ResumeScorer:
         else:
             self.delegate = BasicScorer(config)
 
-    def score(self, resume_text, job_description):
-        return self.delegate.score(resume_text, job_description)
+        # Scoring cascade: keyword-score everything, send only the best to the LLM
+        cascade = config.get("scoring", {}).get("cascade", {}) or {}
+        self.cascade_top_k = cascade.get("top_k", 0)
+        self.cascade_min_score = cascade.get("min_score", 0)
+        self.prefilter = BasicScorer(config)
+        self.cascade_stats = {"llm_calls": 0, "llm_seconds": 0.0, "skipped": 0}
+        # The app shares one scorer between sessions
+        self._stats_lock = threading.Lock()
+        self._top_k_warned = False
+
+    @property
+    def uses_llm(self):
+        return isinstance(self.delegate, LLMScorer)
+
+    @property
+    def cascades(self):
+        return self.uses_llm and bool(self.cascade_top_k or self.cascade_min_score)
+
+    def score(self, resume_text, job_description, sections=None):
+        """
+        Score one resume. sections (the parser's offsets into resume_text)
+        let an LLM prompt use the resume's most relevant sections.
+        """
+        if not self.uses_llm:
+            return self.delegate.score(resume_text, job_description)
+        # One resume at a time there is no batch to take the top_k of; only the min_score cut applies
+        if self.cascade_top_k and not self._top_k_warned:
+            self._top_k_warned = True
+            print("scoring.cascade.top_k only applies to batch scoring (score_batch), not to resumes scored one at a time")
+        if self.cascades and self.cascade_min_score:
+            cheap = self.prefilter.score(resume_text, job_description)
+            if cheap[0] < self.cascade_min_score:
+                return self.not_shortlisted(cheap)
+        return self.score_llm([resume_text], job_description, sections=[sections])[0]
+
+    def shortlist(self, cheap_scores):
+        """
+        Indexes (ascending) of the resumes that go on to the LLM, given their
+        keyword scores: those at or above min_score, and of those only the
+        top_k best. Ties go to the earlier resume.
+        """
+        passed = [i for i, score in enumerate(cheap_scores) if score >= self.cascade_min_score]
+        if self.cascade_top_k:
+            passed = sorted(heapq.nlargest(self.cascade_top_k, passed, key=lambda i: (cheap_scores[i], -i)))
+        return passed
+
+    def not_shortlisted(self, cheap):
+        """
+        Final result for a resume the cascade kept away from the LLM.
+        """
+        with self._stats_lock:
+            self.cascade_stats["skipped"] += 1
+        score, notes, status, matches = cheap
+        return score, notes + " Keyword score only (not sent to the LLM).", status, matches
+
+    def score_llm(self, resume_texts, job_description, costs=None, sections=None):
+        """
+        delegate.score_batch, timed for the cascade savings estimate.
+        """
+        started = time.perf_counter()
+        results = self.delegate.score_batch(resume_texts, job_description, costs, sections)
+        with self._stats_lock:
+            self.cascade_stats["llm_calls"] += len(resume_texts)
+            self.cascade_stats["llm_seconds"] += time.perf_counter() - started
+        return results
+
+    def score_batch(self, resume_texts, job_description, costs=None, sections=None):
+        """
+        Score several resumes, concurrently when the delegate supports it.
+        `costs` (one dict per resume) is filled with LLM usage where available;
+        `sections` optionally holds each resume's section offsets.
+        With a cascade only the shortlist of the batch reaches the LLM.
+        """
+        if not self.uses_llm:
+            return [self.delegate.score(text, job_description) for text in resume_texts]
+        sections = sections if sections is not None else [None] * len(resume_texts)
+        if self.cascades:
+            cheap = [self.prefilter.score(text, job_description) for text in resume_texts]
+            keep = self.shortlist([c[0] for c in cheap])
+            costs = costs if costs is not None else [{} for _ in resume_texts]
+            scored = dict(zip(keep, self.score_llm([resume_texts[i] for i in keep], job_description,
+                                                   [costs[i] for i in keep], [sections[i] for i in keep])))
+            return [scored[i] if i in scored else self.not_shortlisted(cheap[i]) for i in range(len(resume_texts))]
+        return self.delegate.score_batch(resume_texts, job_description, costs, sections)
+
+    def close(self):
+        if hasattr(self.delegate, "close"):
+            self.delegate.close()
+
+    def cascade_savings(self, since=None):
+        """
+        LLM calls made and avoided by the cascade so far, or since `since`, an
+        earlier copy of cascade_stats. Time saved is estimated from the
+        average LLM time per resume.
+        """
+        since = since or {}
+        with self._stats_lock:
+            stats = {key: value - since.get(key, 0) for key, value in self.cascade_stats.items()}
+        per_call = stats["llm_seconds"] / stats["llm_calls"] if stats["llm_calls"] else 0.0
+        return {
+            "LLM calls": stats["llm_calls"],
+            "LLM calls saved": stats["skipped"],
+            "LLM time saved (s)": round(stats["skipped"] * per_call, 1),
+        }
+
+    def rank(self, resume_texts, job_description, top_k=10, doc_ids=None):
+        """
+        Corpus-aware ranking of a batch: BM25 over an inverted index of all the
+        resumes (see src/ranker.py). Returns the top_k (doc_id, score) pairs,
+        best first; doc_ids default to positions in resume_texts.
+        """
+        from .ranker import BM25Index
+
+        index = BM25Index.from_config(self.config)
+        for i, text in enumerate(resume_texts):
+            index.add(doc_ids[i] if doc_ids is not None else i, text)
+        return index.top_k(job_description, top_k)
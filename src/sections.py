@@ -0,0 +1,94 @@
+import re
+
+# Heading text (lowercased, punctuation stripped) -> section name
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "core competencies",
+               "competencies", "technologies", "tech stack", "tools"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"],
+    "projects": ["projects", "personal projects", "key projects"],
+    "education": ["education", "academic background", "academics", "qualifications"],
+    "certifications": ["certifications", "certificates", "licenses", "courses", "training"],
+}
+SECTIONS = ["contact"] + list(SECTION_HEADINGS)
+# The order sections fill a token-budgeted prompt in; contact details say
+# nothing about fit and are only used when no heading was recognized
+PROMPT_PRIORITY = ["skills", "experience", "projects", "summary", "certifications", "education"]
+
+_HEADINGS = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+# A heading line: the heading on its own, or followed by a colon and content ("Skills: Python, SQL")
+_HEADING_LINE = re.compile(r"^[ \t•*#\-]*([A-Za-z &/]{3,40}?)[ \t]*(?::|$)", re.MULTILINE)
+
+
+def segment(text):
+    """
+    Split resume text into sections. Returns [name, start, end] character
+    offsets in text order; whatever precedes the first recognized heading is
+    "contact". Offsets rather than copies are kept so they can be stored
+    next to the text and sliced on demand.
+    """
+    if not text:
+        return []
+    bounds = []
+    for match in _HEADING_LINE.finditer(text):
+        name = _HEADINGS.get(" ".join(match.group(1).lower().replace("&", " and ").split()))
+        if name:
+            bounds.append((match.start(), name))
+
+    sections = []
+    start, name = 0, "contact"
+    for offset, next_name in bounds:
+        if offset > start:
+            sections.append([name, start, offset])
+        start, name = offset, next_name
+    sections.append([name, start, len(text)])
+    return sections
+
+
+def section_text(text, sections, name):
+    """
+    The text of every section called `name`, joined.
+    """
+    return "\n".join(text[start:end] for section, start, end in sections or [] if section == name)
+
+
+def compact_text(text, max_chars=None):
+    """
+    text without blank lines or runs of whitespace, cut to at most max_chars
+    (None for no limit) at a line or word boundary.
+    """
+    text = "\n".join(" ".join(line.split()) for line in (text or "").splitlines() if line.strip())
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    for boundary in ("\n", " "):
+        i = cut.rfind(boundary)
+        if i > 0:
+            return cut[:i]
+    return cut
+
+
+def excerpt(text, sections, max_chars, priority=PROMPT_PRIORITY):
+    """
+    Up to max_chars (None for no limit) of a resume for an LLM prompt: whole
+    sections in `priority` order, the first that no longer fits cut short.
+    Falls back to the start of the text when no section in `priority` was found.
+    sections are segment() offsets; computed here if not given.
+    """
+    sections = sections or segment(text)
+    ranked = sorted((s for s in sections if s[0] in priority), key=lambda s: priority.index(s[0]))
+    if not ranked:
+        return compact_text(text, max_chars)
+
+    parts = []
+    remaining = max_chars
+    for name, start, end in ranked:
+        part = compact_text(text[start:end], remaining)
+        if part:
+            parts.append(part)
+            remaining = None if remaining is None else remaining - len(part) - 2
+        if remaining is not None and remaining <= 0:
+            break
+    return "\n\n".join(parts)
@@ -0,0 +1,121 @@
+import json
+import tempfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from .dedup import NEAR_DUPLICATE_THRESHOLD, NUM_PERM, decode_signature
+from .utils import clean_text_for_excel, detect_duplicates, generate_summary_stats, json_default
+
+OUTPUT_COLUMNS = ["candidate_name", "email", "phone", "score", "status", "reasoning", "matched_keywords", "email_draft", "notes", "duplicate_cluster", "filename"]
+
+# Status -> sheet, in the order main.py has always written them
+STATUS_SHEETS = [("Green", "Shortlisted"), ("Yellow", "Under Review"), ("Red", "Rejected")]
+
+# Spooled in place of the signature of a row that has none
+_NO_SIGNATURE = bytes(4 * NUM_PERM)
+
+
+class ExcelSink:
+    """
+    Collects result rows and writes the Excel report on close().
+
+    Rows are spooled to a temporary file as they arrive, and their text
+    signatures to a second one, as fixed-size binary records that are
+    memory-mapped back for duplicate detection. Only the row's spool offset,
+    email, phone, score and status stay in memory. The workbook is written
+    with openpyxl's write-only mode, streaming rows back from the spool, so
+    memory stays flat regardless of batch size.
+    """
+
+    def __init__(self, output_path, columns=OUTPUT_COLUMNS, dedup_threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.output_path = output_path
+        self.columns = columns
+        self.dedup_threshold = dedup_threshold
+        self._spool = tempfile.TemporaryFile(mode="w+b")
+        self._signatures = tempfile.TemporaryFile(mode="w+b")
+        self._keys = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, row):
+        offset = self._spool.tell()
+        record = {c: row.get(c) for c in self.columns}
+        self._spool.write(json.dumps(record, default=json_default).encode("utf-8") + b"\n")
+        signature = decode_signature(row.get("text_signature"))
+        self._signatures.write(signature.astype("<u4").tobytes() if signature is not None else _NO_SIGNATURE)
+        self._keys.append((offset, row.get("email") or "", row.get("phone") or "", row.get("score", 0), row.get("status")))
+
+    def _read(self, offset):
+        self._spool.seek(offset)
+        return json.loads(self._spool.readline())
+
+    def finalize(self):
+        """
+        Run duplicate detection and summary stats over the collected keys.
+        Returns (keys DataFrame in output order, stats dict).
+        """
+        keys = pd.DataFrame(self._keys, columns=["_offset", "email", "phone", "score", "status"])
+        keys["text_signature"] = self._read_signatures()
+        # Only the duplicate reasons; the row's own notes stay in the spool
+        keys["notes"] = ""
+        keys = detect_duplicates(keys, self.dedup_threshold).drop(columns="text_signature")
+        stats = generate_summary_stats(keys)
+        return keys, stats
+
+    def _read_signatures(self):
+        # One row view per document (no copy), "" where there is no signature
+        self._signatures.flush()
+        if not self._keys or not self.dedup_threshold:
+            return [""] * len(self._keys)
+        matrix = np.memmap(self._signatures, dtype="<u4", mode="r", shape=(len(self._keys), NUM_PERM))
+        present = matrix.any(axis=1)
+        return [matrix[i] if present[i] else "" for i in range(len(self._keys))]
+
+    def _rows(self, keys):
+        for offset, status, notes, cluster in zip(keys["_offset"], keys["status"], keys["notes"], keys["duplicate_cluster"]):
+            record = self._read(offset)
+            # Dedup may have changed status/notes since the row was spooled
+            record["status"] = status
+            record["notes"] = (record.get("notes") or "") + notes
+            record["duplicate_cluster"] = cluster
+            yield [clean_text_for_excel(record.get(c)) for c in self.columns]
+
+    def _write_sheet(self, workbook, title, header, rows):
+        sheet = workbook.create_sheet(title)
+        header_cells = []
+        for name in header:
+            cell = WriteOnlyCell(sheet, value=name)
+            cell.font = Font(bold=True)
+            header_cells.append(cell)
+        sheet.append(header_cells)
+        for row in rows:
+            sheet.append(row)
+
+    def close(self, keys=None, stats=None):
+        """
+        Write the workbook and release the spool. Returns the summary stats.
+        """
+        if keys is None:
+            keys, stats = self.finalize()
+
+        workbook = Workbook(write_only=True)
+        self._write_sheet(workbook, "All Candidates", self.columns, self._rows(keys))
+
+        # Summary Sheet
+        summary = [json_default(v) if hasattr(v, "item") else v for v in stats.values()]
+        self._write_sheet(workbook, "Summary", list(stats.keys()), [summary])
+
+        for status, sheet_name in STATUS_SHEETS:
+            subset = keys[keys["status"] == status]
+            if not subset.empty:
+                self._write_sheet(workbook, sheet_name, self.columns, self._rows(subset))
+
+        workbook.save(self.output_path)
+        self._spool.close()
+        self._signatures.close()
+        return stats
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import sqlite3
+
+from .cache import hash_file
+from .dedup import decode_signature, text_signature
+from .matcher import STOPWORDS, tokenize
+from .utils import json_default
+
+# Extraction costs kept with each candidate (see ResumeParser.parse_file)
+METADATA_FIELDS = ["bytes", "pages", "needs_ocr", "text_chars", "extract_seconds", "cache_hit"]
+
+
+class CandidateStore:
+    """
+    Local SQLite store of parsed candidates with an FTS5 index over their text.
+
+    Each resume is written once, keyed by content hash, with its contact
+    fields, raw text, section offsets and extraction metadata. search() runs
+    a JD against the whole pool as a single indexed query ranked by FTS5's
+    BM25, so historical candidates can be matched to a new requisition
+    without opening any of their files again.
+    """
+
+    def __init__(self, path, extractor_version=""):
+        self.path = path
+        self.extractor_version = extractor_version
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS candidates (
+                id INTEGER PRIMARY KEY, sha256 TEXT UNIQUE, path TEXT, size INTEGER, mtime_ns INTEGER,
+                filename TEXT, candidate_name TEXT, email TEXT, phone TEXT, raw_text TEXT,
+                sections TEXT, text_signature TEXT, metadata TEXT, extractor_version TEXT, added REAL);
+            CREATE INDEX IF NOT EXISTS candidates_path ON candidates(path);
+            CREATE VIRTUAL TABLE IF NOT EXISTS candidates_fts USING fts5(
+                candidate_name, raw_text, content='candidates', content_rowid='id', tokenize='porter unicode61');
+            CREATE TRIGGER IF NOT EXISTS candidates_ai AFTER INSERT ON candidates BEGIN
+                INSERT INTO candidates_fts(rowid, candidate_name, raw_text) VALUES (new.id, new.candidate_name, new.raw_text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS candidates_ad AFTER DELETE ON candidates BEGIN
+                INSERT INTO candidates_fts(candidates_fts, rowid, candidate_name, raw_text)
+                VALUES ('delete', old.id, old.candidate_name, old.raw_text);
+            END;
+        """)
+
+    @classmethod
+    def from_config(cls, config, extractor_version="", path=None):
+        path = path or config.get("store", {}).get("path")
+        return cls(os.path.expanduser(path), extractor_version) if path else None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def contains(self, file_path):
+        """
+        True if file_path is stored and unchanged (same size and mtime).
+        """
+        stat = os.stat(file_path)
+        row = self.conn.execute(
+            "SELECT 1 FROM candidates WHERE path = ? AND size = ? AND mtime_ns = ? AND extractor_version = ?",
+            (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, self.extractor_version),
+        ).fetchone()
+        return row is not None
+
+    def add(self, file_path, data, cost=None):
+        """
+        Store one parsed resume (a ResumeParser.parse_file result with its
+        raw_text). Parse errors are not stored. Re-adding the same content
+        replaces the earlier row, e.g. after the file moved.
+        """
+        if data.get("error") or not data.get("raw_text"):
+            return False
+        stat = os.stat(file_path)
+        metadata = {field: (cost or {}).get(field) for field in METADATA_FIELDS}
+        # The parser already hashed the file when the extraction cache is on
+        sha256 = (cost or {}).get("sha256") or hash_file(file_path)
+        # Delete + insert rather than REPLACE so the FTS delete trigger fires
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DELETE FROM candidates WHERE sha256 = ? OR path = ?", (sha256, os.path.abspath(file_path)))
+            self.conn.execute(
+                "INSERT INTO candidates (sha256, path, size, mtime_ns, filename, candidate_name, email, phone,"
+                " raw_text, sections, text_signature, metadata, extractor_version, added)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sha256, os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns,
+                    data.get("filename"), data.get("candidate_name"), data.get("email"), data.get("phone"),
+                    data["raw_text"], json.dumps(data.get("sections") or []), data.get("text_signature") or "",
+                    json.dumps(metadata, default=json_default), self.extractor_version, time.time(),
+                ),
+            )
+        return True
+
+    @staticmethod
+    def match_query(job_description):
+        """
+        FTS5 query for a JD: any of its distinct words, each quoted so JD
+        punctuation cannot be read as query syntax. Stopwords and single
+        characters are left out.
+        """
+        terms = dict.fromkeys(t for t in tokenize(job_description)
+                              if len(t) > 1 and t not in STOPWORDS and any(c.isalnum() for c in t))
+        return " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+    def search(self, job_description, limit=100):
+        """
+        The `limit` stored candidates that best match the JD, best first, as
+        parse_file-style dicts (with raw_text and sections) plus "pool_rank"
+        and "pool_score" (FTS5 BM25, higher is better).
+        """
+        query = self.match_query(job_description)
+        if not query:
+            return []
+        rows = self.conn.execute(
+            "SELECT c.*, -bm25(candidates_fts, 0.0, 1.0) AS pool_score FROM candidates_fts"
+            " JOIN candidates c ON c.id = candidates_fts.rowid"
+            " WHERE candidates_fts MATCH ? ORDER BY bm25(candidates_fts, 0.0, 1.0) LIMIT ?",
+            (query, limit),
+        ).fetchall()
+        results = []
+        for rank, row in enumerate(rows, start=1):
+            results.append({
+                "filename": row["filename"],
+                "candidate_name": row["candidate_name"],
+                "email": row["email"],
+                "phone": row["phone"],
+                "raw_text": row["raw_text"],
+                "sections": json.loads(row["sections"] or "[]"),
+                # Signatures written with another NUM_PERM are recomputed from the text
+                "text_signature": row["text_signature"] if decode_signature(row["text_signature"]) is not None else text_signature(row["raw_text"]),
+                "path": row["path"],
+                "error": False,
+                "notes": "",
+                "pool_rank": rank,
+                "pool_score": round(row["pool_score"], 4),
+            })
+        return results
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,208 @@
+import os
+import re
+import json
+import time
+import hashlib
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = "resume_analyser"
+
+# The info dict of the profiled() block running in this process, if any
+_active_profile = None
+
+
+@contextmanager
+def doc_span(spans, name):
+    """
+    Time a block into a per-document span list as [name, wall seconds, CPU seconds].
+    Spans travel with the result row, so they survive the trip back from a
+    worker process. A no-op when spans is None.
+    """
+    if spans is None:
+        yield
+        return
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        spans.append([name, time.perf_counter() - wall, time.process_time() - cpu])
+
+
+class Tracer:
+    """
+    Per-stage timing for one run: call count, total wall and CPU seconds and
+    the slowest call. Stages are timed in-process with span(), or merged from
+    the span lists that come back on result rows.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def span(self, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def record(self, name, seconds, cpu_seconds=0.0):
+        stage = self.stages.setdefault(name, {"count": 0, "seconds": 0.0, "cpu_seconds": 0.0, "max_seconds": 0.0})
+        stage["count"] += 1
+        stage["seconds"] += seconds
+        stage["cpu_seconds"] += cpu_seconds
+        stage["max_seconds"] = max(stage["max_seconds"], seconds)
+
+    def merge(self, spans):
+        for name, seconds, cpu_seconds in spans or []:
+            self.record(name, seconds, cpu_seconds)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def rows(self):
+        """
+        One dict per stage, slowest first.
+        """
+        elapsed = self.elapsed() or 1e-9
+        rows = []
+        for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"]):
+            rows.append({
+                "stage": name,
+                "calls": stage["count"],
+                "seconds": round(stage["seconds"], 3),
+                "cpu_seconds": round(stage["cpu_seconds"], 3),
+                "avg_ms": round(stage["seconds"] / stage["count"] * 1000, 2),
+                "max_ms": round(stage["max_seconds"] * 1000, 2),
+                "pct_of_run": round(stage["seconds"] / elapsed * 100, 1),
+            })
+        return rows
+
+    def summary(self):
+        return {"wall_seconds": round(self.elapsed(), 3), "stages": self.rows()}
+
+    def print_breakdown(self):
+        print(f"\n--- Stage breakdown ({self.elapsed():.2f}s wall) ---")
+        print(f"{'stage':<18}{'calls':>8}{'total s':>10}{'cpu s':>10}{'avg ms':>10}{'max ms':>10}{'% run':>8}")
+        for row in self.rows():
+            print(f"{row['stage']:<18}{row['calls']:>8}{row['seconds']:>10.2f}{row['cpu_seconds']:>10.2f}"
+                  f"{row['avg_ms']:>10.1f}{row['max_ms']:>10.1f}{row['pct_of_run']:>8.1f}")
+        print("Per-document stages are summed across workers, so with -w they can exceed 100%.")
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def prometheus_text(self):
+        """
+        The stage totals in Prometheus text exposition format.
+        """
+        metrics = [
+            ("stage_seconds_total", "counter", "Wall seconds spent per stage", "seconds"),
+            ("stage_cpu_seconds_total", "counter", "CPU seconds spent per stage", "cpu_seconds"),
+            ("stage_calls_total", "counter", "Calls per stage", "count"),
+            ("stage_max_seconds", "gauge", "Slowest single call per stage", "max_seconds"),
+        ]
+        lines = []
+        for metric, kind, help_text, field in metrics:
+            name = f"{PROMETHEUS_PREFIX}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, values in sorted(self.stages.items()):
+                label = stage.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{name}{{stage="{label}"}} {values[field]:.6g}')
+        name = f"{PROMETHEUS_PREFIX}_run_seconds"
+        lines += [f"# HELP {name} Wall seconds for the whole run", f"# TYPE {name} gauge", f"{name} {self.elapsed():.6g}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, "w") as f:
+            f.write(self.prometheus_text())
+
+
+def should_profile(name, rate):
+    """
+    Deterministic sampling: the same document is always (or never) profiled
+    for a given rate, whichever worker picks it up.
+    """
+    if rate <= 0:
+        return False
+    if rate >= 1:
+        return True
+    return int(hashlib.sha1(name.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF < rate
+
+
+def active_profile():
+    """
+    The info dict of the profiled() block running in this process, or None.
+    Work handed to a child process (the extraction watchdog) is profiled
+    there and reported back through add_child_profile().
+    """
+    return _active_profile
+
+
+def add_child_profile(child):
+    """
+    Fold a child process's profiled() info into the active block: its
+    profile is merged into this one's and its memory peak counted.
+    """
+    if _active_profile is not None and child:
+        _active_profile.setdefault("children", []).append(child)
+
+
+@contextmanager
+def profiled(profile_dir, name):
+    """
+    Run a block under cProfile and tracemalloc. Dumps the profile to
+    profile_dir and yields a dict that is filled with the profile path and
+    peak traced memory once the block exits.
+    """
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    global _active_profile
+    info = {"name": name, "dir": profile_dir}
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    _active_profile = info
+    profiler.enable()
+    try:
+        yield info
+    finally:
+        profiler.disable()
+        _active_profile = None
+        info["peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+        if started_tracing:
+            tracemalloc.stop()
+        os.makedirs(profile_dir, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]", "_", name)
+        info["path"] = os.path.join(profile_dir, f"{safe_name}.{os.getpid()}.prof")
+        stats = pstats.Stats(profiler)
+        for child in info.pop("children", []):
+            stats.add(child["path"])
+            os.remove(child["path"])
+            info["peak_kb"] = max(info["peak_kb"], child["peak_kb"])
+        stats.dump_stats(info["path"])
+
+
+def print_profile_report(profiles, limit=15):
+    """
+    Merge the sampled per-document profiles and print the hottest functions
+    and the documents with the largest allocation peaks.
+    """
+    import pstats
+
+    paths = [p["path"] for p in profiles if os.path.exists(p.get("path", ""))]
+    if not paths:
+        return
+    print(f"\n--- Profile of {len(paths)} sampled documents (cumulative) ---")
+    pstats.Stats(*paths).sort_stats("cumulative").print_stats(limit)
+    print("Peak traced memory:")
+    for p in sorted(profiles, key=lambda p: -p.get("peak_kb", 0))[:5]:
+        print(f"  {p['peak_kb']:>8} KB  {p['name']}")
+    print(f"Profiles saved in {os.path.dirname(paths[0])} (open with python -m pstats or snakeviz)")
@@ -1,5 +1,9 @@
 import re
+import numpy as np
 import pandas as pd
+from collections import Counter
+
+from .dedup import NEAR_DUPLICATE_THRESHOLD, DuplicateIndex, duplicate_reason, find_clusters, text_signature
 from datetime import datetime
 
 def clean_text_for_excel(text):
@@ -14,6 +18,14 @@ def clean_text_for_excel(text):
     illegal_chars = r'[\x00-\x08\x0b\x0c\x0e-\x1f]'
     return re.sub(illegal_chars, '', text)
 
+def json_default(value):
+    """
+    json.dumps fallback: unwrap numpy scalars, stringify anything else.
+    """
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
 def clean_dataframe_for_excel(df):
     """
     Apply text cleaning to all string columns in the DataFrame.
@@ -23,38 +35,75 @@ def clean_dataframe_for_excel(df):
         df[col] = df[col].apply(clean_text_for_excel)
     return df
 
-def detect_duplicates(df):
+def excel_sheet_name(name, used_names):
+    """
+    Make a valid, unique Excel sheet name (max 31 chars, no []:*?/\\).
+    Adds the result to used_names.
+    """
+    base = re.sub(r'[\[\]:*?/\\]', '_', str(name)).strip("'") or "Sheet"
+    base = base[:31]
+    candidate = base
+    counter = 2
+    while candidate.lower() in {n.lower() for n in used_names}:
+        suffix = f" ({counter})"
+        candidate = base[:31 - len(suffix)] + suffix
+        counter += 1
+    used_names.add(candidate)
+    return candidate
+
+def detect_duplicates(df, threshold=NEAR_DUPLICATE_THRESHOLD):
     """
-    Detect duplicate candidates by email.
-    Keep the one with higher score, mark others as Duplicate.
+    Detect duplicate candidates: the same normalized email or phone, or
+    near-identical resume text (MinHash/LSH over the "text_signature" column,
+    or over "raw_text" if there is no signature column; see src/dedup.py).
+    Keep the one with higher score, mark others as Duplicate. Every row of a
+    group gets the group's number in "duplicate_cluster" ("" if unique).
+    threshold=0 disables the text comparison.
     """
-    if "email" not in df.columns or df.empty:
+    if df.empty:
         return df
         
     # Sort by score descending so we keep the best one
     if "score" in df.columns:
-        df = df.sort_values(by="score", ascending=False)
+        df = df.sort_values(by="score", ascending=False, kind="stable")
         
-    # Create a mask for duplicates
-    # keep='first' means the first occurrence (highest score) is NOT a duplicate
-    duplicates_mask = df.duplicated(subset=["email"], keep='first')
-    
-    # We only care about emails that are not empty
-    has_email = df["email"].str.len() > 0
-    
-    # Mark duplicates
-    # using loc to avoid SettingWithCopyWarning
-    
     # If notes column doesn't exist, create it
     if "notes" not in df.columns:
         df["notes"] = ""
-        
-    duplicate_rows = duplicates_mask & has_email
-    
+
+    blank = [""] * len(df)
+    emails = df["email"].tolist() if "email" in df.columns else blank
+    phones = df["phone"].tolist() if "phone" in df.columns else blank
+    if "text_signature" in df.columns:
+        signatures = df["text_signature"].tolist()
+    elif "raw_text" in df.columns and threshold:
+        signatures = [text_signature(t) if isinstance(t, str) else "" for t in df["raw_text"]]
+    else:
+        signatures = blank
+    roots = find_clusters(emails, phones, signatures, threshold)
+
+    # Rows are in score order, so each cluster's root is its best-scoring row
+    sizes = Counter(roots.tolist())
+    cluster_ids = {}
+    for root in roots.tolist():
+        if sizes[root] > 1 and root not in cluster_ids:
+            cluster_ids[root] = len(cluster_ids) + 1
+    df["duplicate_cluster"] = [cluster_ids.get(root, "") for root in roots.tolist()]
+
+    duplicate_rows = roots != np.arange(len(df))
     if duplicate_rows.any():
         print(f"Detected {duplicate_rows.sum()} duplicate candidates.")
-        df.loc[duplicate_rows, "status"] = "Duplicate"
-        df.loc[duplicate_rows, "notes"] = df.loc[duplicate_rows, "notes"] + " [Duplicate Email]"
+        # using positions to avoid SettingWithCopyWarning and duplicate index labels
+        keys = {"email": emails, "phone": phones, "text_signature": signatures}
+        row = lambda i: {name: values[i] for name, values in keys.items()}
+        status = df.columns.get_loc("status") if "status" in df.columns else None
+        notes = df.columns.get_loc("notes")
+        for i in np.flatnonzero(duplicate_rows):
+            reason = duplicate_reason(row(roots[i]), row(i), threshold)
+            if status is not None:
+                df.iat[i, status] = "Duplicate"
+            existing = df.iat[i, notes] if isinstance(df.iat[i, notes], str) else ""
+            df.iat[i, notes] = f"{existing} [{reason}]"
         
     return df
 
@@ -83,3 +132,79 @@ def generate_summary_stats(df):
     }
     
     return stats
+
+class RunningSummary:
+    """
+    detect_duplicates and generate_summary_stats for results that arrive one
+    at a time. Each add() updates the duplicate marks and counters of the
+    affected cluster only instead of re-scanning every row, so a live view
+    can refresh after every document.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.rows = []
+        self.status_counts = Counter()
+        self.score_total = 0
+        self.threshold = threshold
+        self._index = DuplicateIndex(threshold)
+        self._cluster_ids = {}
+        self._next_cluster = 0
+
+    def add(self, row):
+        row.setdefault("notes", "")
+        row["duplicate_cluster"] = ""
+        if "text_signature" not in row and self.threshold:
+            row["text_signature"] = text_signature(row.get("raw_text") or "")
+        self.rows.append(row)
+        self.status_counts[row.get("status")] += 1
+        self.score_total += row.get("score", 0)
+
+        root = self._index.add(row.get("email"), row.get("phone"), row.get("text_signature"))
+        members = self._index.members[root]
+        if len(members) < 2:
+            return
+        # Keep the higher score (the earlier row on ties), like detect_duplicates
+        keeper = max(members, key=lambda i: (self.rows[i].get("score", 0), -i))
+        cluster_id = min((self._cluster_ids.pop(i) for i in members if i in self._cluster_ids), default=None)
+        if cluster_id is None:
+            self._next_cluster += 1
+            cluster_id = self._next_cluster
+        self._cluster_ids[root] = cluster_id
+        for i in members:
+            self.rows[i]["duplicate_cluster"] = self._cluster_ids[root]
+            if i != keeper and self.rows[i].get("status") != "Duplicate":
+                self._mark_duplicate(self.rows[keeper], self.rows[i])
+
+    def _mark_duplicate(self, keeper, row):
+        self.status_counts[row.get("status")] -= 1
+        self.status_counts["Duplicate"] += 1
+        row["status"] = "Duplicate"
+        row["notes"] = f"{row['notes']} [{duplicate_reason(keeper, row, self.threshold)}]"
+
+    def stats(self):
+        """
+        Same keys as generate_summary_stats.
+        """
+        total = len(self.rows)
+        if not total:
+            return {}
+        counts = self.status_counts
+        return {
+            "Total processed": total,
+            "Valid Candidates": total - counts["Duplicate"] - counts["Error"],
+            "Green": counts["Green"],
+            "Yellow": counts["Yellow"],
+            "Red": counts["Red"],
+            "Avg Score": self.score_total / total,
+            "Duplicates": counts["Duplicate"],
+            "Errors": counts["Error"],
+        }
+
+    def dataframe(self):
+        """
+        The rows so far, best score first (the order detect_duplicates leaves them in).
+        """
+        df = pd.DataFrame(self.rows)
+        if "score" in df.columns:
+            df = df.sort_values(by="score", ascending=False, kind="stable")
+        return df